@@ -1,8 +1,10 @@
-import neat
+import random
+
 import numpy as np
 
 from auto_player import AutomaticMaster, AutoPlayer
 from fitness_calc import create_fitness_calculator
+from neat_common.genome_codec import GenomeArrays, create_recurrent_network
 from box_game.game_engine import BoxPusherEngine, Level, Direction, MOVE_VECTOR
 from box_game.training_levels import generate_level
 from training_reporter import FITNESS_FORMAT
@@ -18,13 +20,15 @@ first_training_level = Level(
 )
 
 
-def generate_training_levels():
-    return [generate_level() for _ in range(30)]
+def generate_training_levels(seed=None):
+    # a seed recreates the same levels in every process
+    rng = random.Random(seed) if seed is not None else random
+    return [generate_level(rng) for _ in range(30)]
 
 
 class NeuralNetMaster:
-    def __init__(self):
-        self.levels = generate_training_levels()
+    def __init__(self, levels=None):
+        self.levels = levels if levels is not None else generate_training_levels()
 
     @staticmethod
     def create_game(genome, config, level):
@@ -64,6 +68,23 @@ class NeuralNetMaster:
         auto_master.start()
 
 
+__worker_config = None
+__worker_levels = None, None
+
+
+def init_worker(config):
+    global __worker_config
+    __worker_config = config
+
+
+def eval_genome(genome_data, levels_seed):
+    global __worker_levels
+    # the levels change once per generation, every process generates them once from the generation's seed
+    if __worker_levels[0] != levels_seed:
+        __worker_levels = levels_seed, generate_training_levels(levels_seed)
+    return NeuralNetMaster(__worker_levels[1]).eval_genome(GenomeArrays.decode(genome_data), __worker_config)
+
+
 class GameState:
     def __init__(self, engine: BoxPusherEngine):
         self.engine = engine
@@ -122,7 +143,7 @@ class GameState:
 
 class NeuralNetPlayer(AutoPlayer):
     def __init__(self, game_state: GameState, genome, config):
-        self.net = neat.nn.RecurrentNetwork.create(genome, config)
+        self.net = create_recurrent_network(genome, config)
         self.game_state = game_state
         self.directions = [Direction.UP, Direction.DOWN, Direction.LEFT, Direction.RIGHT]
 
@@ -1,6 +1,7 @@
 import math
 import os
 import pickle
+import random
 import sys
 from datetime import datetime
 from multiprocessing import Pool
@@ -9,12 +10,23 @@ from signal import signal, SIGINT
 import neat
 from neat.population import CompleteExtinctionException
 
-from nn_player import NeuralNetMaster
+# packages shared with the other projects are next to the boxpusher directory
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_DIR not in sys.path:
+    sys.path.append(PROJECT_DIR)
+
+from neat_common.genome_codec import encode_genome
+from neat_common.runtime_scheduler import RuntimeScheduler
+from nn_player import NeuralNetMaster, init_worker, eval_genome, generate_training_levels
 from training_reporter import TrainingReporter
 
 SHOWCASE_EVERY_GEN = 20
+# task runtimes are printed with the batch stats, 0 disables them
+TASK_TIMES_EVERY_GEN = SHOWCASE_EVERY_GEN
 EVAL_PROCESSES = 4
 RECORD_BEST_AFTER_GEN = 100
+# all genomes play the same levels of a generation, runtimes are predicted across generations
+LEVELS_TASK = 'levels'
 LOCAL_DIR = os.path.dirname(__file__)
 TRAININGS_DIR = os.path.join(LOCAL_DIR, 'trainings')
 
@@ -29,7 +41,9 @@ class Trainer:
 
         self.pool = None
         signal(SIGINT, self.stop)
-        self.pool = Pool(processes=EVAL_PROCESSES)
+        # workers keep the config, tasks only carry the genome and the seed of the generation's levels
+        self.pool = Pool(processes=EVAL_PROCESSES, initializer=init_worker, initargs=(self.population.config,))
+        self.scheduler = RuntimeScheduler(self.pool, self.population.reproduction.ancestors)
 
     def run(self):
         try:
@@ -48,11 +62,16 @@ class Trainer:
 
     def eval_population(self, population_genomes, config: neat.config.Config):
         self.eval_counter += 1
-        genome_configs = [(genome, config) for _, genome in population_genomes]
-        nn_master = NeuralNetMaster()
-
-        pop_fitness = self.pool.starmap(nn_master.eval_genome, genome_configs)
-        for (fitness, *pop_stats), (genome, _) in zip(pop_fitness, genome_configs):
+        genomes = [genome for _, genome in population_genomes]
+        levels_seed = random.getrandbits(32)
+        nn_master = NeuralNetMaster(generate_training_levels(levels_seed))
+
+        eval_params = [(encode_genome(genome, config.genome_config), levels_seed) for genome in genomes]
+        self.scheduler.next_generation()
+        pop_fitness = self.scheduler.starmap(eval_genome, [genome.key for genome in genomes], LEVELS_TASK, eval_params)
+        if TASK_TIMES_EVERY_GEN and self.eval_counter % TASK_TIMES_EVERY_GEN == 0:
+            print(self.scheduler.task_times_text())
+        for (fitness, *pop_stats), genome in zip(pop_fitness, genomes):
             genome.fitness = fitness
             self.reporter.add_pop_game_stats(*pop_stats)
 
@@ -12,6 +12,13 @@ import numpy as np
 from neat.population import CompleteExtinctionException
 from neat.reporting import BaseReporter
 
+# packages shared with the other projects are next to the chatter directory
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_DIR not in sys.path:
+    sys.path.append(PROJECT_DIR)
+
+from neat_common.source_network import create_source_network
+
 ALLOWED_LETTERS = string.ascii_lowercase + ' '
 CONSIDER_CHARS = 3
 NET_FILE_SUFFIX = '.net'
@@ -55,8 +62,7 @@ class ChatterBox:
 
     @staticmethod
     def from_genome(genome, config):
-        net = neat.nn.FeedForwardNetwork.create(genome, config)
-        return ChatterBox(net, genome)
+        return ChatterBox(create_source_network(genome, config), genome)
 
     @staticmethod
     def from_fs(name):
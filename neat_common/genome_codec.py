@@ -0,0 +1,108 @@
+import struct
+
+import numpy as np
+from neat.genome import DefaultGenome
+from neat.graphs import required_for_output
+from neat.nn import RecurrentNetwork
+
+HEADER = struct.Struct('<qII')
+NODE_DTYPE = np.dtype([('key', '<i8'), ('bias', '<f8'), ('response', '<f8'),
+                       ('activation', 'u1'), ('aggregation', 'u1')])
+CONNECTION_DTYPE = np.dtype([('in_node', '<i8'), ('out_node', '<i8'), ('weight', '<f8'), ('enabled', '?')])
+
+
+class GenomeArrays:
+    def __init__(self, key, nodes, connections):
+        self.key = key
+        self.nodes = nodes
+        self.connections = connections
+
+    @staticmethod
+    def from_genome(genome, genome_config):
+        activation_ids = {name: ix for ix, name in enumerate(genome_config.activation_options)}
+        aggregation_ids = {name: ix for ix, name in enumerate(genome_config.aggregation_options)}
+        nodes = np.array([(key, ng.bias, ng.response, activation_ids[ng.activation], aggregation_ids[ng.aggregation])
+                          for key, ng in genome.nodes.items()], dtype=NODE_DTYPE)
+        # connection order is kept, networks sum their inputs in this order
+        connections = np.array([(*cg.key, cg.weight, cg.enabled) for cg in genome.connections.values()],
+                               dtype=CONNECTION_DTYPE)
+        return GenomeArrays(genome.key, nodes, connections)
+
+    def to_genome(self, genome_config):
+        genome = DefaultGenome(self.key)
+        for key, bias, response, activation, aggregation in self.nodes.tolist():
+            node = genome_config.node_gene_type(key)
+            node.bias, node.response = bias, response
+            node.activation = genome_config.activation_options[activation]
+            node.aggregation = genome_config.aggregation_options[aggregation]
+            genome.nodes[key] = node
+        for in_node, out_node, weight, enabled in self.connections.tolist():
+            connection = genome_config.connection_gene_type((in_node, out_node))
+            connection.weight, connection.enabled = weight, enabled
+            genome.connections[connection.key] = connection
+        return genome
+
+    def network_genes(self, genome_config):
+        activations, aggregations = genome_config.activation_options, genome_config.aggregation_options
+        nodes = {key: (bias, response, activations[activation], aggregations[aggregation])
+                 for key, bias, response, activation, aggregation in self.nodes.tolist()}
+        expressed = self.connections[self.connections['enabled']]
+        connections = [((in_node, out_node), weight) for in_node, out_node, weight, _ in expressed.tolist()]
+        return nodes, connections
+
+    def create_network(self, config):
+        genome_config = config.genome_config
+        connections = self.connections.tolist()
+        required = required_for_output(genome_config.input_keys, genome_config.output_keys,
+                                       [(in_node, out_node) for in_node, out_node, _, _ in connections])
+
+        # same node and input order as neat.nn.RecurrentNetwork.create
+        node_inputs = {}
+        for in_node, out_node, weight, enabled in connections:
+            if enabled and (out_node in required or in_node in required):
+                node_inputs.setdefault(out_node, []).append((in_node, weight))
+
+        nodes = {key: (bias, response, activation, aggregation)
+                 for key, bias, response, activation, aggregation in self.nodes.tolist()}
+        node_evals = []
+        for node_key, inputs in node_inputs.items():
+            bias, response, activation, aggregation = nodes[node_key]
+            activation_function = genome_config.activation_defs.get(genome_config.activation_options[activation])
+            aggregation_function = genome_config.aggregation_function_defs.get(
+                genome_config.aggregation_options[aggregation])
+            node_evals.append((node_key, activation_function, aggregation_function, bias, response, inputs))
+        return RecurrentNetwork(genome_config.input_keys, genome_config.output_keys, node_evals)
+
+    def encode(self):
+        return HEADER.pack(self.key, len(self.nodes), len(self.connections)) + \
+               self.nodes.tobytes() + self.connections.tobytes()
+
+    @staticmethod
+    def decode(data):
+        key, node_count, connection_count = HEADER.unpack_from(data)
+        nodes = np.frombuffer(data, dtype=NODE_DTYPE, count=node_count, offset=HEADER.size)
+        connections = np.frombuffer(data, dtype=CONNECTION_DTYPE, count=connection_count,
+                                    offset=HEADER.size + nodes.nbytes)
+        return GenomeArrays(key, nodes, connections)
+
+
+def encode_genome(genome, genome_config):
+    return GenomeArrays.from_genome(genome, genome_config).encode()
+
+
+def network_genes(genome, genome_config):
+    if isinstance(genome, GenomeArrays):
+        return genome.network_genes(genome_config)
+    nodes = {key: (ng.bias, ng.response, ng.activation, ng.aggregation) for key, ng in genome.nodes.items()}
+    connections = [(cg.key, cg.weight) for cg in genome.connections.values() if cg.enabled]
+    return nodes, connections
+
+
+def as_genome(genome, genome_config):
+    return genome.to_genome(genome_config) if isinstance(genome, GenomeArrays) else genome
+
+
+def create_recurrent_network(genome, config):
+    if isinstance(genome, GenomeArrays):
+        return genome.create_network(config)
+    return RecurrentNetwork.create(genome, config)
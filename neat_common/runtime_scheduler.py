@@ -0,0 +1,64 @@
+import time
+
+SLOWEST_TASK_COUNT = 3
+TASK_FMT = '#{} [{}] {:.2f}s'
+
+
+def timed_call(task):
+    ix, function, params = task
+    start = time.perf_counter()
+    result = function(*params)
+    return ix, result, time.perf_counter() - start
+
+
+class RuntimeScheduler:
+    def __init__(self, pool, ancestors=None):
+        self.pool = pool
+        self.ancestors = ancestors if ancestors is not None else {}
+        self.__runtimes, self.__previous_runtimes = {}, {}
+        self.__task_times = []
+
+    def next_generation(self):
+        # runtimes of the previous generation are kept for elites and parents
+        self.__previous_runtimes, self.__runtimes = self.__runtimes, {}
+        self.__task_times = []
+
+    def starmap(self, function, genome_keys, task_key, params):
+        params = list(params)
+        expected = [self.expected_runtime(genome_key, task_key) for genome_key in genome_keys]
+        known = [runtime for runtime in expected if runtime is not None]
+        default = sum(known) / len(known) if known else 0
+        expected = [default if runtime is None else runtime for runtime in expected]
+
+        # longest expected tasks first, so no long task starts when the other processes are running out of work
+        order = sorted(range(len(params)), key=lambda ix: expected[ix], reverse=True)
+        results = [None] * len(params)
+        for ix, result, runtime in self.pool.imap_unordered(timed_call, [(ix, function, params[ix]) for ix in order]):
+            results[ix] = result
+            self.__runtimes[(genome_keys[ix], task_key)] = runtime
+            self.__task_times.append((runtime, genome_keys[ix], task_key))
+        return results
+
+    def expected_runtime(self, genome_key, task_key):
+        runtime = self.__known_runtime(genome_key, task_key)
+        if runtime is None:
+            parent_runtimes = [self.__known_runtime(parent_key, task_key)
+                               for parent_key in self.ancestors.get(genome_key, ())]
+            parent_runtimes = [runtime for runtime in parent_runtimes if runtime is not None]
+            runtime = max(parent_runtimes) if parent_runtimes else None
+        return runtime
+
+    def __known_runtime(self, genome_key, task_key):
+        key = genome_key, task_key
+        return self.__runtimes.get(key, self.__previous_runtimes.get(key))
+
+    @property
+    def task_count(self):
+        return len(self.__task_times)
+
+    def task_times_text(self):
+        total = sum(runtime for runtime, _, _ in self.__task_times)
+        slowest = sorted(self.__task_times, reverse=True)[:SLOWEST_TASK_COUNT]
+        return 'Task times: {} tasks, mean {:.2f}s, slowest: {}'.format(
+            len(self.__task_times), total / len(self.__task_times),
+            ', '.join(TASK_FMT.format(genome_key, task_key, runtime) for runtime, genome_key, task_key in slowest))
@@ -0,0 +1,84 @@
+from math import exp
+
+from neat.graphs import feed_forward_layers
+
+from .genome_codec import network_genes
+
+ACTIVATION_SOURCE = {
+    'sigmoid': '1.0 / (1.0 + exp(-max(-60.0, min(60.0, 5.0 * {0}))))',
+    'clamped': 'max(-1.0, min(1.0, {0}))',
+    'relu': '{0} if {0} > 0.0 else 0.0'
+}
+# same reductions as the neat aggregation functions
+AGGREGATION_SOURCE = {
+    'sum': lambda terms: ' + '.join(terms) or '0',
+    'product': lambda terms: ' * '.join('({})'.format(term) for term in terms) or '1.0',
+    'max': lambda terms: 'max([{}])'.format(', '.join(terms)),
+    'min': lambda terms: 'min([{}])'.format(', '.join(terms))
+}
+SOURCE_CACHE_SIZE = 2000
+
+
+class SourceNetwork:
+    def __init__(self, source):
+        self.source = source
+        self.activate = compile_source(source)
+
+    def __getstate__(self):
+        return self.source
+
+    def __setstate__(self, source):
+        self.__init__(source)
+
+
+__source_cache = {}
+
+
+def create_source_network(genome, config):
+    nodes, connections = network_genes(genome, config.genome_config)
+    key = genome.key, hash((tuple(nodes.items()), tuple(connections)))
+    if key not in __source_cache:
+        if len(__source_cache) >= SOURCE_CACHE_SIZE:
+            __source_cache.clear()
+        __source_cache[key] = SourceNetwork(create_source(genome, config))
+    return __source_cache[key]
+
+
+def create_source(genome, config):
+    genome_config = config.genome_config
+    input_keys, output_keys = genome_config.input_keys, genome_config.output_keys
+    nodes, connection_weights = network_genes(genome, genome_config)
+    connections = [key for key, _ in connection_weights]
+    names = {key: 'i{}'.format(ix) for ix, key in enumerate(input_keys)}
+
+    lines = [
+        'def activate(inputs):',
+        '    if len(inputs) != {}:'.format(len(input_keys)),
+        '        raise RuntimeError("Expected {0:n} inputs, got {1:n}".format(' + str(len(input_keys)) + ', len(inputs)))',
+        '    {}, = inputs'.format(', '.join(names.values()))
+    ]
+    for layer in feed_forward_layers(input_keys, output_keys, connections):
+        for node in sorted(layer):
+            bias, response, activation, aggregation = nodes[node]
+            if aggregation not in AGGREGATION_SOURCE:
+                raise RuntimeError('unsupported aggregation: "{}"'.format(aggregation))
+            if activation not in ACTIVATION_SOURCE:
+                raise RuntimeError('unsupported activation: "{}"'.format(activation))
+            # same input order as neat, so results are bit-identical to FeedForwardNetwork
+            terms = ['{} * {!r}'.format(names[in_node], weight)
+                     for (in_node, out_node), weight in connection_weights if out_node == node]
+            names[node] = 'v{}'.format(node)
+            lines.append('    {} = {!r} + {!r} * ({})'.format(names[node], bias, response,
+                                                             AGGREGATION_SOURCE[aggregation](terms)))
+            lines.append('    {} = {}'.format(names[node], ACTIVATION_SOURCE[activation].format(names[node])))
+
+    # outputs cut off from the inputs are never evaluated and stay at 0.0, as in neat
+    outputs = [names.get(key, '0.0') for key in output_keys]
+    lines.append('    return [{}]'.format(', '.join(outputs)))
+    return '\n'.join(lines) + '\n'
+
+
+def compile_source(source):
+    namespace = {'exp': exp}
+    exec(compile(source, '<genome network>', 'exec'), namespace)
+    return namespace['activate']
@@ -1,11 +1,10 @@
 import os
 import sys
 
-from demo_player import DemoMaster
-from game.track_builder import TrackBuilderWindow
-from manual_player import ManualMaster
-from neural_master import NeuralMaster
-from neural import visualize_network
+# packages shared with the other projects are next to the racer directory
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_DIR not in sys.path:
+    sys.path.append(PROJECT_DIR)
 
 LOCAL_DIR = os.path.dirname(__file__)
 TOP_PLAYERS_FILE = os.path.join(LOCAL_DIR, 'examples', 'top_players.pd')
@@ -17,11 +16,43 @@ def __print_help():
     print('\t2            \ttwo-player mode')
     print('\tdemo         \tdemo mode')
     print('\ttrain        \ttraining mode')
+    print('\ttrain --resume <file>\tresume training from checkpoint <file>')
     print('\tplay <files> \tshowcase best players from <files>')
     print('\ttop          \tshowcase random players from \'{}\''.format(TOP_PLAYERS_FILE))
     print('\tbuild        \topen track builder')
     print('\tvisual <file>\tshow network from file')
+    print('\tworker <host:port> [processes]\tevaluate genomes for a training coordinator')
+    print('\tbench [file] \trun benchmarks, results are stored in [file] (default: \'racer/benchmarks\')')
+    print('\tbench compare <baseline> [file]\tcompare benchmark results [file] (default: new run) with <baseline>')
+
+
+if len(sys.argv) > 2 and sys.argv[1] == 'worker':
+    # worker hosts don't need a display, so none of the window modules are imported
+    from neural.distributed_pool import run_worker
+    from neural.training_configs import load_configs
+
+    processes = int(sys.argv[3]) if len(sys.argv) > 3 else None
+    run_worker(sys.argv[2], load_configs()[1].coordinator_authkey, processes)
+    sys.exit(0)
 
+if len(sys.argv) > 1 and sys.argv[1] == 'bench':
+    # benchmarks run headless as well
+    from benchmark import run_benchmarks, compare_results
+
+    if len(sys.argv) > 2 and sys.argv[2] == 'compare':
+        if len(sys.argv) < 4:
+            __print_help()
+            sys.exit(2)
+        results_file = sys.argv[4] if len(sys.argv) > 4 else run_benchmarks()
+        sys.exit(1 if compare_results(sys.argv[3], results_file) else 0)
+    run_benchmarks(sys.argv[2] if len(sys.argv) > 2 else None)
+    sys.exit(0)
+
+from demo_player import DemoMaster
+from game.track_builder import TrackBuilderWindow
+from manual_player import ManualMaster
+from neural_master import NeuralMaster
+from neural import visualize_network
 
 if len(sys.argv) > 1:
     cmd = sys.argv[1]
@@ -29,6 +60,8 @@ if len(sys.argv) > 1:
         DemoMaster().run()
     elif cmd == '2':
         ManualMaster(True).run()
+    elif cmd == 'train' and len(sys.argv) > 3 and sys.argv[2] == '--resume':
+        NeuralMaster().train(sys.argv[3])
     elif cmd == 'train':
         NeuralMaster().train()
     elif cmd == 'play' and len(sys.argv) > 2:
@@ -0,0 +1,209 @@
+import copy
+import glob
+import json
+import os
+import pickle
+import platform
+import sys
+import timeit
+from datetime import datetime
+from multiprocessing import Pool
+
+import numpy as np
+
+from game.racer_engine import CAR_COLL_BOX, PlayerOperation, PlayerState, Track, create_collision_box
+from game.compiled_level import compile_level
+from game.tracers import TracerLines, TRACE_LINE_ANGLES
+from game.tracks import Trainings
+from neat_common.genome_codec import encode_genome
+from neural import best_player_keep
+from neural.neural_player import NeuralPlayer, create_network
+from neural.population_evaluator import PopulationEvaluator
+from neural.training_configs import load_configs
+from neural.training_worker import init_worker, evaluate_genome
+
+LOCAL_DIR = os.path.dirname(__file__)
+EXAMPLES_FILES = os.path.join(LOCAL_DIR, 'examples', '*.pd')
+BENCHMARKS_DIR = os.path.join(LOCAL_DIR, 'benchmarks')
+
+BENCH_SEED = 0
+REPEAT = 3
+POSE_COUNT = 2000
+STEP_COUNT = 2000
+STEP_DT = 1 / 60
+STATE_RESET_STEPS = 100
+REGRESSION_TOLERANCE = 0.1
+RESULT_FMT = '{:<36} {:>14,.1f} {}'
+COMPARE_FMT = '{:<36} {:>14} {:>14} {:>8}  {}'
+
+
+def create_results_file_name():
+    if not os.path.exists(BENCHMARKS_DIR):
+        os.mkdir(BENCHMARKS_DIR)
+    ts = datetime.now().strftime('%Y%m%d-%H%M%S')
+    return os.path.join(BENCHMARKS_DIR, '{}_bench.json'.format(ts))
+
+
+def measure_rate(function, count, repeat=REPEAT):
+    # the least disturbed run is the closest to the actual speed
+    return count / min(timeit.repeat(function, number=1, repeat=repeat))
+
+
+def load_example_genomes(genome_config):
+    # players were pickled before the neural package existed
+    sys.modules.setdefault('best_player_keep', best_player_keep)
+    genomes = []
+    for file_name in sorted(glob.glob(EXAMPLES_FILES)):
+        with open(file_name, 'rb') as f:
+            genomes.extend(player.genome for player in pickle.load(f))
+    for key, genome in enumerate(genomes):
+        # examples have an input more than there are tracers today, its connections are removed
+        genome.key = key
+        genome.connections = {conn_key: conn for conn_key, conn in genome.connections.items()
+                              if conn_key[0] >= 0 or conn_key[0] in genome_config.input_keys}
+    return genomes
+
+
+class RacerBenchmark:
+    def __init__(self):
+        self.neat_config, self.training_config = load_configs()
+        # the population rate measures plain evaluations, without recording or timing
+        self.worker_config = copy.copy(self.training_config)
+        self.worker_config.record_trajectories = self.worker_config.record_sensors = False
+        self.worker_config.phase_timing = False
+        self.worker_config.trajectory_archive = ''
+        genome_config = self.neat_config.genome_config
+        genome_config.num_inputs = len(TRACE_LINE_ANGLES)
+        genome_config.input_keys = [-ix - 1 for ix in range(genome_config.num_inputs)]
+        self.levels = Trainings().entries()
+        self.genomes = load_example_genomes(genome_config)
+        self.results = {}
+
+    def run(self, process_counts=None):
+        print('benchmark: {} example genomes, {} levels, network: {}, field resolution: {}'.format(
+            len(self.genomes), len(self.levels), self.training_config.network, self.training_config.field_resolution))
+        rng = np.random.default_rng(BENCH_SEED)
+        for level, limit in self.levels:
+            fields = compile_level(level).fields(self.training_config.field_resolution) \
+                if self.training_config.field_resolution else None
+            poses = self.__random_poses(rng, level)
+            track = Track(level, fields=fields)
+            corners = [create_collision_box(CAR_COLL_BOX, x, y, np.cos(rot), np.sin(rot))
+                       for x, y, rot in zip(poses[:, 0], poses[:, 1], np.radians(poses[:, 2]))]
+            on_track = np.array([track.contains(car_corners) for car_corners in corners])
+
+            self.__add('player_state_update', level.name, 'steps/s', self.__player_state_rate(level, fields))
+            self.__add('track_contains', level.name, 'calls/s',
+                       measure_rate(lambda: [track.contains(car_corners) for car_corners in corners], len(corners)))
+            self.__add('tracer_distances', level.name, 'calls/s', self.__tracer_rate(level, poses[on_track]))
+            self.__add('evaluate_genome', level.name, 'runs/s', self.__evaluate_rate(level, limit))
+        self.__add('network_activate', None, 'calls/s', self.__activate_rate(rng))
+
+        cpu_count = os.cpu_count()
+        process_counts = process_counts if process_counts else sorted({1, 2, 4, cpu_count})
+        for processes in process_counts:
+            self.__add('eval_population', '{} processes'.format(processes), 'genomes/s',
+                       self.__population_rate(processes))
+        return self.results
+
+    def __add(self, name, variant, unit, value):
+        if variant is not None:
+            name = '{}[{}]'.format(name, variant)
+        self.results[name] = {'value': value, 'unit': unit}
+        print(RESULT_FMT.format(name, value, unit))
+
+    @staticmethod
+    def __random_poses(rng, level):
+        return np.column_stack((rng.uniform(0, level.width, POSE_COUNT), rng.uniform(0, level.height, POSE_COUNT),
+                                rng.uniform(0, 360, POSE_COUNT)))
+
+    @staticmethod
+    def __player_state_rate(level, fields):
+        state = PlayerState(level, fields)
+        operations = PlayerOperation()
+        operations.accelerate()
+        start = state.x, state.y, state.rotation, state.speed
+
+        def update_steps():
+            for step in range(STEP_COUNT):
+                if step % STATE_RESET_STEPS == 0:
+                    state.x, state.y, state.rotation, state.speed = start
+                    if step % (2 * STATE_RESET_STEPS):
+                        operations.stop_left()
+                    else:
+                        operations.turn_left()
+                state.update(STEP_DT, operations)
+
+        return measure_rate(update_steps, STEP_COUNT)
+
+    @staticmethod
+    def __tracer_rate(level, poses):
+        tracers = TracerLines(level)
+        positions = [(x, y) for x, y in poses[:, :2].tolist()]
+        rotations = poses[:, 2].tolist()
+        return measure_rate(lambda: [tracers.get_trace_distances(pos, rot) for pos, rot in zip(positions, rotations)],
+                            len(positions))
+
+    def __activate_rate(self, rng):
+        genome = max(self.genomes, key=lambda gen: gen.fitness)
+        net = create_network(genome, self.neat_config, self.training_config.network)
+        inputs = rng.uniform(0, 500, (STEP_COUNT, len(TRACE_LINE_ANGLES))).tolist()
+        return measure_rate(lambda: [net.activate(net_input) for net_input in inputs], len(inputs))
+
+    def __evaluate_rate(self, level, limit):
+        def evaluate_all():
+            for seed, genome in enumerate(self.genomes):
+                NeuralPlayer.evaluate_genome(genome, self.neat_config, level, limit,
+                                             self.training_config.field_resolution, self.training_config.network, seed)
+
+        return measure_rate(evaluate_all, len(self.genomes), repeat=1)
+
+    def __population_rate(self, processes):
+        # one generation of the example genomes, evaluated like the training does
+        genomes = copy.deepcopy(self.genomes)
+        with Pool(processes=processes, initializer=init_worker,
+                  initargs=(self.neat_config, self.worker_config)) as pool:
+            evaluator = PopulationEvaluator(self.neat_config, self.worker_config, pool)
+            genome_data = [encode_genome(genome, self.neat_config.genome_config) for genome in genomes[:processes]]
+            pool.starmap(evaluate_genome, [(data, 0, seed) for seed, data in enumerate(genome_data)])
+            return measure_rate(lambda: evaluator.evaluate(genomes), len(genomes), repeat=1)
+
+
+def run_benchmarks(results_file=None, process_counts=None):
+    results = RacerBenchmark().run(process_counts)
+    results_file = results_file if results_file else create_results_file_name()
+    meta = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(), 'numpy': np.__version__,
+        'platform': platform.platform(), 'cpu_count': os.cpu_count()
+    }
+    with open(results_file, 'w') as f:
+        json.dump({'meta': meta, 'results': results}, f, indent=2)
+    print('benchmark results stored: <{}>'.format(results_file))
+    return results_file
+
+
+def compare_results(baseline_file, results_file, tolerance=REGRESSION_TOLERANCE):
+    with open(baseline_file, 'r') as f:
+        baseline = json.load(f)['results']
+    with open(results_file, 'r') as f:
+        results = json.load(f)['results']
+
+    regressions = []
+    print(COMPARE_FMT.format('benchmark', 'baseline', 'current', 'change', ''))
+    for name, base in baseline.items():
+        if name not in results:
+            print(COMPARE_FMT.format(name, '{:,.1f}'.format(base['value']), '-', '', 'missing'))
+            continue
+        # all results are rates, higher is better
+        change = results[name]['value'] / base['value'] - 1
+        flag = ''
+        if change < -tolerance:
+            flag = 'REGRESSION'
+            regressions.append(name)
+        elif change > tolerance:
+            flag = 'improved'
+        print(COMPARE_FMT.format(name, '{:,.1f}'.format(base['value']), '{:,.1f}'.format(results[name]['value']),
+                                 '{:+.1%}'.format(change), flag))
+    print('{} regressions (tolerance {:.0%}) against <{}>'.format(len(regressions), tolerance, baseline_file))
+    return regressions
@@ -0,0 +1,150 @@
+import numpy as np
+from shapely.geometry import Polygon
+
+from .geometry import EdgeSet, RectangleSet, create_obstacle_corners, ring_edges, box_edges
+from .tracks import Level
+
+COLLISION_CELL_SIZE = 64
+
+
+class ShapelyCollision:
+    def __init__(self, level: Level):
+        self.__outside = Polygon(np.reshape(level.outer_track, (-1, 2)))
+        self.__inside = Polygon(np.reshape(level.inner_track, (-1, 2)))
+        all_obstacles = [Polygon(corners) for corners in create_obstacle_corners(level.obstacles)]
+        self.__obstacles = list(filter(
+            lambda obs: self.__outside.intersects(obs) and not self.__inside.covers(obs),
+            all_obstacles))
+
+    def contains(self, corners):
+        geometry = Polygon(corners)
+        return self.__outside.contains(geometry) and \
+               not self.__inside.intersects(geometry) and \
+               not any([obs.intersects(geometry) for obs in self.__obstacles])
+
+    def contains_all(self, corners):
+        return np.array([self.contains(car_corners) for car_corners in corners], dtype=bool)
+
+
+class SegmentCollision:
+    def __init__(self, level: Level, cell_size=COLLISION_CELL_SIZE):
+        outer_edges, inner_edges = ring_edges(level.outer_track), ring_edges(level.inner_track)
+        self.outer, self.inner = EdgeSet(outer_edges), EdgeSet(inner_edges)
+        self.obstacles = RectangleSet(self.__relevant_obstacles(create_obstacle_corners(level.obstacles)))
+        obstacle_edges = np.reshape(box_edges(self.obstacles.corners), (-1, 2, 2))
+        self.rings = EdgeSet(np.concatenate((outer_edges, inner_edges)), cell_size)
+        self.edges = EdgeSet(np.concatenate((outer_edges, inner_edges, obstacle_edges)), cell_size)
+        self.__index_cells(cell_size)
+
+    def __index_cells(self, cell_size):
+        # plain lists for single cars, numpy calls cost more than the few edges near a car
+        edges = self.edges.edges
+        self.__cell_size = cell_size
+        self.__origin_x, self.__origin_y = edges.min(axis=(0, 1)).tolist()
+        self.__cols, self.__rows = (np.floor((edges.max(axis=(0, 1)) - edges.min(axis=(0, 1))) / cell_size)
+                                    .astype(int) + 1).tolist()
+        cells = [[] for _ in range(self.__cols * self.__rows)]
+        for (x0, y0), (x1, y1) in edges.tolist():
+            bounds = min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1)
+            for cell in self.__cells_of(*bounds):
+                cells[cell].append((x0, y0, x1, y1) + bounds)
+        self.__cell_edges = cells
+
+        rows = [[] for _ in range(self.__rows)]
+        rings = self.rings
+        inv_slopes = np.where(rings.delta[:, 1] == 0, 0, rings.delta[:, 0] / np.where(rings.delta[:, 1] == 0, 1,
+                                                                                      rings.delta[:, 1]))
+        for (sx, sy), (_, ey), inv_slope in zip(rings.start[:-1].tolist(), rings.end[:-1].tolist(),
+                                                inv_slopes[:-1].tolist()):
+            for row in range(self.__row_of(min(sy, ey)), self.__row_of(max(sy, ey)) + 1):
+                rows[row].append((sx, sy, ey, inv_slope))
+        self.__row_ring_edges = rows
+
+        obstacles = [[] for _ in range(self.__cols * self.__rows)]
+        for corners in self.obstacles.corners:
+            origin, side_u, side_v = corners[0], corners[1] - corners[0], corners[3] - corners[0]
+            rectangle = (*origin.tolist(), *side_u.tolist(), *side_v.tolist(),
+                         float(np.sum(side_u ** 2)), float(np.sum(side_v ** 2)))
+            low, high = corners.min(axis=0).tolist(), corners.max(axis=0).tolist()
+            for cell in self.__cells_of(*low, *high):
+                obstacles[cell].append(rectangle)
+        self.__cell_obstacles = obstacles
+
+        # cells without edges are either inside the track or outside, as their center is
+        col, row = np.meshgrid(np.arange(self.__cols), np.arange(self.__rows))
+        centers = np.stack(((col.flatten() + 0.5) * cell_size + self.__origin_x,
+                            (row.flatten() + 0.5) * cell_size + self.__origin_y), axis=-1)
+        inside = self.rings.contain_points(centers) & ~self.obstacles.contain_points(centers)
+        self.__cell_inside = [None if cell_edges else contained
+                              for cell_edges, contained in zip(cells, inside.tolist())]
+
+    def __col_of(self, x):
+        return min(max(int((x - self.__origin_x) // self.__cell_size), 0), self.__cols - 1)
+
+    def __row_of(self, y):
+        return min(max(int((y - self.__origin_y) // self.__cell_size), 0), self.__rows - 1)
+
+    def __cells_of(self, low_x, low_y, high_x, high_y):
+        cols = range(self.__col_of(low_x), self.__col_of(high_x) + 1)
+        return [row * self.__cols + col for row in range(self.__row_of(low_y), self.__row_of(high_y) + 1)
+                for col in cols]
+
+    def __relevant_obstacles(self, obstacles):
+        within_outer = np.any(self.outer.contain_points(obstacles), axis=1)
+        within_inner = np.all(self.inner.contain_points(obstacles), axis=1)
+        intersects_outer = self.outer.crossed_by(obstacles) | within_outer
+        covered_by_inner = ~self.inner.crossed_by(obstacles) & within_inner
+        return obstacles[intersects_outer & ~covered_by_inner]
+
+    def contains(self, corners):
+        (x0, y0), (x1, y1), (x2, y2), (x3, y3) = corners.tolist()
+        low_x, low_y, high_x, high_y = min(x0, x1, x2, x3), min(y0, y1, y2, y3), max(x0, x1, x2, x3), max(y0, y1, y2, y3)
+        first_x, first_y = (x0 - self.__origin_x) // self.__cell_size, (y0 - self.__origin_y) // self.__cell_size
+        if not (0 <= first_x < self.__cols and 0 <= first_y < self.__rows):
+            # outside of all edges, so outside of the outer track
+            return False
+        first_cell = int(first_y) * self.__cols + int(first_x)
+        cells = self.__cells_of(low_x, low_y, high_x, high_y)
+        if all(self.__cell_inside[cell] is not None for cell in cells):
+            return self.__cell_inside[first_cell]
+
+        # same tests as contains_all: no edge crosses a car side, the first corner is on the track
+        sides = ((x0, y0, x1, y1), (x1, y1, x2, y2), (x2, y2, x3, y3), (x3, y3, x0, y0))
+        for cell in cells:
+            for q0x, q0y, q1x, q1y, e_low_x, e_low_y, e_high_x, e_high_y in self.__cell_edges[cell]:
+                if e_low_x > high_x or e_high_x < low_x or e_low_y > high_y or e_high_y < low_y:
+                    continue
+                edge_x, edge_y = q1x - q0x, q1y - q0y
+                for p0x, p0y, p1x, p1y in sides:
+                    d1 = edge_x * (p0y - q0y) - edge_y * (p0x - q0x)
+                    d2 = edge_x * (p1y - q0y) - edge_y * (p1x - q0x)
+                    if d1 * d2 > 0:
+                        continue
+                    side_x, side_y = p1x - p0x, p1y - p0y
+                    d3 = side_x * (q0y - p0y) - side_y * (q0x - p0x)
+                    d4 = side_x * (q1y - p0y) - side_y * (q1x - p0x)
+                    if d3 * d4 > 0:
+                        continue
+                    if d1 == 0 and d2 == 0 and not (min(p0x, p1x) <= e_high_x and e_low_x <= max(p0x, p1x) and
+                                                    min(p0y, p1y) <= e_high_y and e_low_y <= max(p0y, p1y)):
+                        continue
+                    return False
+
+        crossings = 0
+        for sx, sy, ey, inv_slope in self.__row_ring_edges[int(first_y)]:
+            if (sy > y0) != (ey > y0) and x0 < sx + (y0 - sy) * inv_slope:
+                crossings += 1
+        if crossings % 2 == 0:
+            return False
+        for ox, oy, ux, uy, vx, vy, len_u, len_v in self.__cell_obstacles[first_cell]:
+            proj_u, proj_v = (x0 - ox) * ux + (y0 - oy) * uy, (x0 - ox) * vx + (y0 - oy) * vy
+            if 0 <= proj_u <= len_u and 0 <= proj_v <= len_v:
+                return False
+        return True
+
+    def contains_all(self, corners):
+        first_corners = corners[:, 0]
+        # track rings and obstacles are too large to fit inside a car without crossing its edges
+        return ~self.edges.crossed_by(corners) & \
+               self.rings.contain_points(first_corners) & \
+               ~self.obstacles.contain_points(first_corners)
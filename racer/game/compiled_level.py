@@ -0,0 +1,53 @@
+from collections import OrderedDict
+
+import numpy as np
+
+from .collision import COLLISION_CELL_SIZE, SegmentCollision
+from .geometry import EdgeSet, RingPath, box_edges, create_obstacle_corners, line_edges
+from .level_fields import LevelFields
+from .tracks import Level
+
+TRACER_CELL_SIZE = 64
+# the training levels fit in, generated levels only evict the least recently used ones
+COMPILED_LEVELS_CACHE_SIZE = 32
+
+
+class CompiledLevel:
+    def __init__(self, level: Level):
+        self.key = level_key(level)
+        self.name, self.width, self.height = level.name, level.width, level.height
+        self.collision = SegmentCollision(level, COLLISION_CELL_SIZE)
+        self.tracer_lines = create_tracer_lines(level, TRACER_CELL_SIZE)
+        self.outer_path, self.inner_path = RingPath(level.outer_track), RingPath(level.inner_track)
+        self.__fields = {}
+
+    def fields(self, resolution) -> LevelFields:
+        if resolution not in self.__fields:
+            self.__fields[resolution] = LevelFields(self, resolution)
+        return self.__fields[resolution]
+
+
+def create_tracer_lines(level: Level, cell_size=TRACER_CELL_SIZE):
+    obstacle_edges = np.reshape(box_edges(create_obstacle_corners(level.obstacles)), (-1, 2, 2))
+    tracer_lines = np.concatenate((line_edges(level.outer_track), line_edges(level.inner_track), obstacle_edges))
+    return EdgeSet(tracer_lines, cell_size)
+
+
+def level_key(level: Level):
+    # levels arrive pickled in every pool task, so identity changes while the geometry does not
+    obstacles = tuple((obs.x, obs.y, obs.rot) for obs in level.obstacles)
+    return level.name, level.width, level.height, tuple(level.outer_track), tuple(level.inner_track), obstacles
+
+
+__compiled_levels = OrderedDict()
+
+
+def compile_level(level: Level) -> CompiledLevel:
+    key = level_key(level)
+    if key in __compiled_levels:
+        __compiled_levels.move_to_end(key)
+    else:
+        if len(__compiled_levels) >= COMPILED_LEVELS_CACHE_SIZE:
+            __compiled_levels.popitem(last=False)
+        __compiled_levels[key] = CompiledLevel(level)
+    return __compiled_levels[key]
@@ -0,0 +1,273 @@
+import math
+from bisect import bisect_right
+
+import numpy as np
+
+BOX_COLL_BOX = np.array([[-18, -18], [18, -18], [18, 18], [-18, 18]])
+# below this many query/edge pairs a plain vectorized pass is cheaper than grid lookups
+GRID_MIN_PAIRS = 20000
+# RingPath.project_point looks up the closest edge candidates of a cell, outside of the margin all edges are checked
+PROJECTION_CELL_SIZE = 16
+PROJECTION_MARGIN = 256
+
+
+def create_collision_boxes(box, x, y, cosine, sine):
+    cosine, sine = cosine[:, np.newaxis], sine[:, np.newaxis]
+    box_x, box_y = box[:, 0], box[:, 1]
+    corners_x = x[:, np.newaxis] + cosine * box_x + sine * box_y
+    corners_y = y[:, np.newaxis] - sine * box_x + cosine * box_y
+    return np.stack((corners_x, corners_y), axis=-1)
+
+
+def create_obstacle_corners(obstacles):
+    if not len(obstacles):
+        return np.empty((0, len(BOX_COLL_BOX), 2))
+    x, y, rot = np.array([(obs.x, obs.y, obs.rot) for obs in obstacles], dtype=float).T
+    rot = np.radians(rot)
+    return create_collision_boxes(BOX_COLL_BOX, x, y, np.cos(rot), np.sin(rot))
+
+
+def line_edges(points):
+    points = np.reshape(np.asarray(points, dtype=float), (-1, 2))
+    return np.stack((points[:-1], points[1:]), axis=1)
+
+
+def ring_edges(points):
+    points = np.reshape(np.asarray(points, dtype=float), (-1, 2))
+    edges = np.stack((points, np.roll(points, -1, axis=0)), axis=1)
+    return edges[np.any(edges[:, 0] != edges[:, 1], axis=1)]
+
+
+def box_edges(corners):
+    return np.stack((corners, np.roll(corners, -1, axis=-2)), axis=-2)
+
+
+def __cross(origin, a, b):
+    return (a[..., 0] - origin[..., 0]) * (b[..., 1] - origin[..., 1]) - \
+           (a[..., 1] - origin[..., 1]) * (b[..., 0] - origin[..., 0])
+
+
+def segments_intersect(p0, p1, q0, q1):
+    d1, d2 = __cross(q0, q1, p0), __cross(q0, q1, p1)
+    d3, d4 = __cross(p0, p1, q0), __cross(p0, p1, q1)
+    crossing = (d1 * d2 <= 0) & (d3 * d4 <= 0)
+    collinear = (d1 == 0) & (d2 == 0)
+    if not collinear.any():
+        return crossing
+    overlap = np.all((np.minimum(p0, p1) <= np.maximum(q0, q1)) & (np.minimum(q0, q1) <= np.maximum(p0, p1)), axis=-1)
+    return crossing & (~collinear | overlap)
+
+
+def segments_sq_distances(points, starts, deltas):
+    delta_x, delta_y = deltas[:, 0], deltas[:, 1]
+    sq_lengths = delta_x ** 2 + delta_y ** 2
+    offset_x = points[:, np.newaxis, 0] - starts[:, 0]
+    offset_y = points[:, np.newaxis, 1] - starts[:, 1]
+    fractions = np.clip((offset_x * delta_x + offset_y * delta_y) / np.where(sq_lengths == 0, 1, sq_lengths), 0, 1)
+    return (offset_x - fractions * delta_x) ** 2 + (offset_y - fractions * delta_y) ** 2, fractions
+
+
+def closest_on_segments(points, starts, deltas):
+    sq_distances, fractions = segments_sq_distances(points, starts, deltas)
+    closest = np.argmin(sq_distances, axis=-1)
+    point_ix = np.arange(len(points))
+    return np.sqrt(sq_distances[point_ix, closest]), closest, fractions[point_ix, closest]
+
+
+class RingPath:
+    def __init__(self, points):
+        edges = ring_edges(points)
+        self.starts, self.deltas = edges[:, 0], edges[:, 1] - edges[:, 0]
+        self.lengths = np.sqrt(np.sum(self.deltas ** 2, axis=-1))
+        self.offsets = np.concatenate(([0], np.cumsum(self.lengths)))
+        self.length = self.offsets[-1]
+        self.__segments = [(sx, sy, dx, dy, dx * dx + dy * dy)
+                           for (sx, sy), (dx, dy) in zip(self.starts.tolist(), self.deltas.tolist())]
+        self.__offsets = self.offsets.tolist()
+        self.__lengths = self.lengths.tolist()
+        self.__index_cells()
+
+    def __index_cells(self):
+        points = np.concatenate((self.starts, self.starts + self.deltas))
+        self.__origin_x, self.__origin_y = (points.min(axis=0) - PROJECTION_MARGIN).tolist()
+        self.__cols, self.__rows = (np.ceil((points.max(axis=0) + PROJECTION_MARGIN - points.min(axis=0) +
+                                             PROJECTION_MARGIN) / PROJECTION_CELL_SIZE).astype(int)).tolist()
+        col, row = np.meshgrid(np.arange(self.__cols), np.arange(self.__rows))
+        centers = np.stack(((col.flatten() + 0.5) * PROJECTION_CELL_SIZE + self.__origin_x,
+                            (row.flatten() + 0.5) * PROJECTION_CELL_SIZE + self.__origin_y), axis=-1)
+        # any point of a cell is at most half a diagonal from its center: an edge can only be the closest one
+        # when it is at most a diagonal farther from the center than the closest edge to the center
+        diagonal = np.sqrt(2) * PROJECTION_CELL_SIZE
+        distances = np.sqrt(segments_sq_distances(centers, self.starts, self.deltas)[0])
+        candidates = distances <= distances.min(axis=-1, keepdims=True) + diagonal + 1e-6
+        self.__cell_segments = [[(edge_ix,) + self.__segments[edge_ix] for edge_ix in np.flatnonzero(cell)]
+                                for cell in candidates]
+
+    def project(self, points):
+        _, edge_ix, fractions = closest_on_segments(points, self.starts, self.deltas)
+        return self.offsets[edge_ix] + fractions * self.lengths[edge_ix]
+
+    def project_point(self, x, y):
+        col, row = (x - self.__origin_x) // PROJECTION_CELL_SIZE, (y - self.__origin_y) // PROJECTION_CELL_SIZE
+        if not (0 <= col < self.__cols and 0 <= row < self.__rows):
+            _, edge_ix, fractions = closest_on_segments(np.array([[x, y]]), self.starts, self.deltas)
+            edge_ix = int(edge_ix[0])
+            return self.__offsets[edge_ix] + float(fractions[0]) * self.__lengths[edge_ix], edge_ix
+
+        # same arithmetic and tie breaking (lowest edge index) as closest_on_segments
+        best_sq, best_fraction, best_ix = math.inf, 0.0, 0
+        for edge_ix, sx, sy, dx, dy, sq_length in self.__cell_segments[int(row) * self.__cols + int(col)]:
+            ox, oy = x - sx, y - sy
+            fraction = min(max((ox * dx + oy * dy) / (sq_length if sq_length else 1), 0.0), 1.0)
+            ox, oy = ox - fraction * dx, oy - fraction * dy
+            sq_distance = ox * ox + oy * oy
+            if sq_distance < best_sq:
+                best_sq, best_fraction, best_ix = sq_distance, fraction, edge_ix
+        return self.__offsets[best_ix] + best_fraction * self.__lengths[best_ix], best_ix
+
+    def interpolate(self, distance):
+        edge_ix = min(max(bisect_right(self.__offsets, distance) - 1, 0), len(self.__segments) - 1)
+        sx, sy, dx, dy, _ = self.__segments[edge_ix]
+        fraction = min(max((distance - self.__offsets[edge_ix]) / self.__lengths[edge_ix], 0), 1)
+        return sx + fraction * dx, sy + fraction * dy
+
+
+class SegmentGrid:
+    def __init__(self, edges, cell_size):
+        self.cell_size = cell_size
+        self.origin = edges.min(axis=(0, 1))
+        self.cols, self.rows = self.__cell_of(edges.max(axis=(0, 1))) + 1
+        empty_ix = len(edges)
+
+        cells = [[] for _ in range(self.cols * self.rows)]
+        rows = [[] for _ in range(self.rows)]
+        for edge_ix, (low, high) in enumerate(zip(self.__cell_of(edges.min(axis=1)), self.__cell_of(edges.max(axis=1)))):
+            for row in range(low[1], high[1] + 1):
+                rows[row].append(edge_ix)
+                for col in range(low[0], high[0] + 1):
+                    cells[row * self.cols + col].append(edge_ix)
+        self.__cell_edges = self.__padded(cells + [[]], empty_ix)
+        self.__row_edges = self.__padded(rows + [[]], empty_ix)
+
+    def __cell_of(self, points):
+        return np.floor((points - self.origin) / self.cell_size).astype(int)
+
+    @staticmethod
+    def __padded(buckets, empty_ix):
+        padded = np.full((len(buckets), max(1, max(map(len, buckets)))), empty_ix)
+        for ix, bucket in enumerate(buckets):
+            padded[ix, :len(bucket)] = bucket
+        return padded
+
+    def box_candidates(self, low, high):
+        limit = (self.cols - 1, self.rows - 1)
+        low_cell = np.clip(self.__cell_of(low), 0, limit)
+        high_cell = np.clip(self.__cell_of(high), 0, limit)
+        span_x, span_y = np.max(high_cell - low_cell, axis=0) + 1
+        offset_x, offset_y = np.repeat(np.arange(span_x), span_y), np.tile(np.arange(span_y), span_x)
+        col = low_cell[:, 0, np.newaxis] + offset_x
+        row = low_cell[:, 1, np.newaxis] + offset_y
+        valid = (col <= high_cell[:, 0, np.newaxis]) & (row <= high_cell[:, 1, np.newaxis])
+        cells = np.where(valid, row * self.cols + col, self.cols * self.rows)
+        return np.reshape(self.__cell_edges[cells], (len(low), -1))
+
+    def row_candidates(self, y):
+        row = np.floor((y - self.origin[1]) / self.cell_size).astype(int)
+        return self.__row_edges[np.where((row >= 0) & (row < self.rows), row, self.rows)]
+
+
+class EdgeSet:
+    def __init__(self, edges, cell_size=None):
+        self.edges = edges
+        self.grid = SegmentGrid(edges, cell_size) if cell_size and len(edges) else None
+        # padding entry for grid buckets, NaN coordinates never cross or span anything
+        padded = np.concatenate((edges, np.full((1, 2, 2), np.nan)))
+        self.start, self.end = padded[:, 0], padded[:, 1]
+        self.delta = self.end - self.start
+        self.low, self.high = np.minimum(self.start, self.end), np.maximum(self.start, self.end)
+        self.__all_ix = np.arange(len(edges))[np.newaxis]
+        horizontal = self.delta[:, 1] == 0
+        self.__inv_slope = np.where(horizontal, 0, self.delta[:, 0] / np.where(horizontal, 1, self.delta[:, 1]))
+
+    def __len__(self):
+        return len(self.edges)
+
+    def __use_grid(self, query_count):
+        return self.grid is not None and query_count * len(self.edges) >= GRID_MIN_PAIRS
+
+    def crossed_by(self, boxes):
+        crossed = np.zeros(len(boxes), dtype=bool)
+        low, high = boxes.min(axis=1), boxes.max(axis=1)
+        edge_ix = self.grid.box_candidates(low, high) if self.__use_grid(len(boxes)) else self.__all_ix
+        near = np.all(self.low[edge_ix] <= high[:, np.newaxis], axis=-1) & \
+               np.all(self.high[edge_ix] >= low[:, np.newaxis], axis=-1)
+        box_ix, candidate_ix = np.nonzero(near)
+        if len(box_ix):
+            edge_ix = np.broadcast_to(edge_ix, near.shape)[box_ix, candidate_ix]
+            sides = box_edges(boxes[box_ix])
+            edge_start, edge_end = self.start[edge_ix, np.newaxis], self.end[edge_ix, np.newaxis]
+            hits = segments_intersect(sides[..., 0, :], sides[..., 1, :], edge_start, edge_end)
+            crossed[box_ix[np.any(hits, axis=1)]] = True
+        return crossed
+
+    def contain_points(self, points):
+        px, py = points[..., np.newaxis, 0], points[..., np.newaxis, 1]
+        use_grid = self.__use_grid(np.size(points) // 2)
+        edge_ix = self.grid.row_candidates(points[..., 1]) if use_grid else self.__all_ix[0]
+        start_x, start_y, end_y = self.start[edge_ix, 0], self.start[edge_ix, 1], self.end[edge_ix, 1]
+        spans = (start_y > py) != (end_y > py)
+        cross_x = start_x + (py - start_y) * self.__inv_slope[edge_ix]
+        crossings = np.count_nonzero(spans & (px < cross_x), axis=-1)
+        return (crossings % 2) == 1
+
+    def cast_rays(self, origins, deltas):
+        if not self.__use_grid(len(origins)):
+            return self.__ray_fractions(origins, deltas, self.__all_ix)
+
+        fractions = np.full(len(origins), np.inf)
+        active = np.arange(len(origins))
+        ray_length = np.max(np.abs(deltas), initial=0)
+        step_start, step_end = 0, min(1, self.grid.cell_size / ray_length) if ray_length else 1
+        while len(active) and step_start < 1:
+            start = origins[active] + deltas[active] * step_start
+            end = origins[active] + deltas[active] * step_end
+            edge_ix = self.grid.box_candidates(np.minimum(start, end), np.maximum(start, end))
+            step_fractions = self.__ray_fractions(origins[active], deltas[active], edge_ix)
+            found = step_fractions <= step_end
+            fractions[active[found]] = step_fractions[found]
+            active = active[~found]
+            step_start, step_end = step_end, min(1, step_end * 2)
+        return fractions
+
+    def __ray_fractions(self, origins, deltas, edge_ix):
+        ray_x, ray_y = deltas[:, np.newaxis, 0], deltas[:, np.newaxis, 1]
+        line_x, line_y = self.delta[edge_ix, 0], self.delta[edge_ix, 1]
+        offset = self.start[edge_ix] - origins[:, np.newaxis]
+        offset_x, offset_y = offset[..., 0], offset[..., 1]
+
+        denominator = ray_x * line_y - ray_y * line_x
+        parallel = denominator == 0
+        denominator = np.where(parallel, 1, denominator)
+        ray_fraction = (offset_x * line_y - offset_y * line_x) / denominator
+        line_fraction = (offset_x * ray_y - offset_y * ray_x) / denominator
+        hits = ~parallel & (ray_fraction >= 0) & (ray_fraction <= 1) & (line_fraction >= 0) & (line_fraction <= 1)
+        return np.min(np.where(hits, ray_fraction, np.inf), axis=-1, initial=np.inf)
+
+
+class RectangleSet:
+    def __init__(self, corners):
+        self.corners = corners
+        self.__origin = corners[:, 0]
+        self.__side_u, self.__side_v = corners[:, 1] - self.__origin, corners[:, 3] - self.__origin
+        self.__len_u = np.sum(self.__side_u ** 2, axis=-1)
+        self.__len_v = np.sum(self.__side_v ** 2, axis=-1)
+
+    def __len__(self):
+        return len(self.corners)
+
+    def contain_points(self, points):
+        offset = points[..., np.newaxis, :] - self.__origin
+        proj_u = np.sum(offset * self.__side_u, axis=-1)
+        proj_v = np.sum(offset * self.__side_v, axis=-1)
+        inside = (proj_u >= 0) & (proj_u <= self.__len_u) & (proj_v >= 0) & (proj_v <= self.__len_v)
+        return np.any(inside, axis=-1)
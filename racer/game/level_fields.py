@@ -0,0 +1,56 @@
+import numpy as np
+
+from .geometry import closest_on_segments
+
+FIELD_CHUNK_SIZE = 1024
+
+
+class LevelFields:
+    def __init__(self, compiled_level, resolution):
+        self.resolution = resolution
+        self.cols = int(np.ceil(compiled_level.width / resolution))
+        self.rows = int(np.ceil(compiled_level.height / resolution))
+        self.width, self.height = self.cols * resolution, self.rows * resolution
+        # nearest cell centre is at most half a cell diagonal away from any point in the cell
+        self.lookup_error = resolution * np.sqrt(0.5)
+
+        cell_x, cell_y = np.meshgrid((np.arange(self.cols) + 0.5) * resolution, (np.arange(self.rows) + 0.5) * resolution)
+        centers = np.column_stack((cell_x.ravel(), cell_y.ravel()))
+        collision = compiled_level.collision
+        occupancy = collision.rings.contain_points(centers) & ~collision.obstacles.contain_points(centers)
+        wall_starts, wall_deltas = collision.edges.edges[:, 0], collision.edges.edges[:, 1] - collision.edges.edges[:, 0]
+        wall_distance = self.__chunked(centers, lambda pts: closest_on_segments(pts, wall_starts, wall_deltas)[0])
+
+        self.signed_distance = np.reshape(np.where(occupancy, wall_distance, -wall_distance), (self.rows, self.cols))
+        self.outer_path, self.inner_path = compiled_level.outer_path, compiled_level.inner_path
+        self.outer_progress = np.reshape(self.__chunked(centers, self.outer_path.project), (self.rows, self.cols))
+        self.inner_progress = np.reshape(self.__chunked(centers, self.inner_path.project), (self.rows, self.cols))
+
+    @staticmethod
+    def __chunked(points, field_function):
+        return np.concatenate([field_function(points[ix:ix + FIELD_CHUNK_SIZE])
+                               for ix in range(0, len(points), FIELD_CHUNK_SIZE)])
+
+    def __cells(self, x, y):
+        col = np.clip((np.asarray(x) // self.resolution).astype(int), 0, self.cols - 1)
+        row = np.clip((np.asarray(y) // self.resolution).astype(int), 0, self.rows - 1)
+        return row, col
+
+    def clearance(self, x, y):
+        inside = (x >= 0) & (x < self.width) & (y >= 0) & (y < self.height)
+        return np.where(inside, self.signed_distance[self.__cells(x, y)] - self.lookup_error, -np.inf)
+
+    def progress(self, x, y):
+        col_pos = np.clip(np.asarray(x) / self.resolution - 0.5, 0, self.cols - 1)
+        row_pos = np.clip(np.asarray(y) / self.resolution - 0.5, 0, self.rows - 1)
+        col, row = np.minimum(col_pos.astype(int), self.cols - 2), np.minimum(row_pos.astype(int), self.rows - 2)
+        col_frac, row_frac = col_pos - col, row_pos - row
+        return self.__bilinear(self.outer_progress, row, col, row_frac, col_frac), \
+               self.__bilinear(self.inner_progress, row, col, row_frac, col_frac)
+
+    @staticmethod
+    def __bilinear(field, row, col, row_frac, col_frac):
+        top = field[row, col] * (1 - col_frac) + field[row, col + 1] * col_frac
+        bottom = field[row + 1, col] * (1 - col_frac) + field[row + 1, col + 1] * col_frac
+        return top * (1 - row_frac) + bottom * row_frac
+
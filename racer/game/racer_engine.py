@@ -1,8 +1,12 @@
 import math
 
 import numpy as np
-from shapely.geometry import Polygon, LinearRing, Point
+from shapely.geometry import Polygon
 
+from .collision import ShapelyCollision
+from .compiled_level import compile_level
+from .geometry import RingPath, create_collision_boxes
+from .level_fields import LevelFields
 from .tracks import Level
 
 CAR_BOUNDS = (-15, -11, 33, 11)
@@ -10,12 +14,16 @@ CAR_BOUND_POINTS = (CAR_BOUNDS[0], CAR_BOUNDS[1], CAR_BOUNDS[2], CAR_BOUNDS[1],
                     CAR_BOUNDS[2], CAR_BOUNDS[3], CAR_BOUNDS[0], CAR_BOUNDS[3]
                     )
 CAR_COLL_BOX = np.reshape(CAR_BOUND_POINTS, (-1, 2)) * 0.95
+CAR_COLL_RADIUS = np.max(np.sqrt(np.sum((CAR_COLL_BOX - np.mean(CAR_COLL_BOX, axis=0)) ** 2, axis=1)))
 MAX_CAR_SPEED = 300
 MAX_CAR_ROTATION = 200
 CAR_FRICTION = 0.98
 MIN_SPEED = 10
+FIELD_MAX_PROGRESS_STEP = 30
 
-BOX_COLL_BOX = np.array([[-18, -18], [18, -18], [18, 18], [-18, 18]])
+SHAPELY_COLLISION = 'shapely'
+SEGMENT_COLLISION = 'segments'
+DEFAULT_COLLISION = SEGMENT_COLLISION
 
 
 class PlayerOperation:
@@ -23,61 +31,59 @@ class PlayerOperation:
     REV_IX = 1
     LEFT_IX = 2
     RIGHT_IX = 3
+    FWD = 1 << FWD_IX
+    REV = 1 << REV_IX
+    LEFT = 1 << LEFT_IX
+    RIGHT = 1 << RIGHT_IX
+
+    __slots__ = ('_bits',)
 
     def __init__(self):
-        self._data = [False] * 4
+        self._bits = 0
 
     def get_move_factor(self):
-        if self._data[self.FWD_IX]:
+        if self._bits & self.FWD:
             return 1
-        if self._data[self.REV_IX]:
+        if self._bits & self.REV:
             return -1
         return 0
 
     def get_turn_factor(self):
-        if self._data[self.LEFT_IX]:
+        if self._bits & self.LEFT:
             return -1
-        if self._data[self.RIGHT_IX]:
+        if self._bits & self.RIGHT:
             return 1
         return 0
 
     def accelerate(self):
-        self._data[self.FWD_IX] = True
-        self._data[self.REV_IX] = False
+        self._bits = (self._bits & ~self.REV) | self.FWD
 
     def reverse(self):
-        self._data[self.FWD_IX] = False
-        self._data[self.REV_IX] = True
+        self._bits = (self._bits & ~self.FWD) | self.REV
 
     def stop_direction(self):
-        self._data[self.FWD_IX] = False
-        self._data[self.REV_IX] = False
+        self._bits &= ~(self.FWD | self.REV)
 
     def turn_left(self):
-        self._data[self.LEFT_IX] = True
-        self._data[self.RIGHT_IX] = False
+        self._bits = (self._bits & ~self.RIGHT) | self.LEFT
 
     def turn_right(self):
-        self._data[self.LEFT_IX] = False
-        self._data[self.RIGHT_IX] = True
+        self._bits = (self._bits & ~self.LEFT) | self.RIGHT
 
     def stop_left(self):
-        self._data[self.LEFT_IX] = False
+        self._bits &= ~self.LEFT
 
     def stop_right(self):
-        self._data[self.RIGHT_IX] = False
+        self._bits &= ~self.RIGHT
 
     def stop_all(self):
-        self._data[self.FWD_IX] = False
-        self._data[self.REV_IX] = False
-        self._data[self.LEFT_IX] = False
-        self._data[self.RIGHT_IX] = False
+        self._bits = 0
 
 
 class RacerEngine:
-    def __init__(self, level):
-        self.player_state = PlayerState(level)
-        self.track = Track(level)
+    def __init__(self, level, fields: LevelFields = None):
+        self.player_state = PlayerState(level, fields)
+        self.track = Track(level, fields=fields)
         self.__game_over = False
 
     @property
@@ -91,21 +97,100 @@ class RacerEngine:
 
     def update(self, dt, operations):
         self.player_state.update(dt, operations)
-        if not self.track.contains(self.player_state.boundaries):
+        if not self.track.contains(self.player_state.corners):
             self.game_over = True
 
 
+class BatchRacerEngine:
+    def __init__(self, level: Level, car_count, fields: LevelFields = None):
+        start = level.single_car
+        self.track = Track(level, fields=fields)
+        self.x = np.full(car_count, start.x, dtype=float)
+        self.y = np.full(car_count, start.y, dtype=float)
+        self.rotation = np.full(car_count, start.rot, dtype=float)
+        self.speed = np.zeros(car_count)
+        self.distance = np.zeros(car_count)
+        self.is_alive = np.ones(car_count, dtype=bool)
+        self.boundaries = create_collision_boxes(CAR_COLL_BOX, self.x, self.y,
+                                                 np.cos(np.radians(self.rotation)),
+                                                 np.sin(np.radians(self.rotation)))
+        self.__distance_tracker = BatchDistanceTracker(level, car_count, fields)
+
+    @property
+    def car_count(self):
+        return len(self.x)
+
+    @property
+    def game_over(self):
+        return not self.is_alive.any()
+
+    def stop(self, car_mask):
+        self.is_alive[car_mask] = False
+
+    def update(self, dt, operations):
+        alive = np.flatnonzero(self.is_alive)
+        if not len(alive):
+            return
+        operations = np.asarray(operations, dtype=bool)[alive]
+        dt = np.broadcast_to(dt, self.x.shape)[alive]
+
+        speed = self.speed[alive] * CAR_FRICTION
+        move_fact = np.where(operations[:, PlayerOperation.FWD_IX], 1,
+                             np.where(operations[:, PlayerOperation.REV_IX], -1, 0))
+        moved_speed = np.clip(speed + MAX_CAR_SPEED * dt * move_fact, -MAX_CAR_SPEED, MAX_CAR_SPEED)
+        speed = np.where(move_fact != 0, moved_speed, np.where(np.abs(speed) < MIN_SPEED, 0, speed))
+
+        turn_fact = np.where(operations[:, PlayerOperation.LEFT_IX], -1,
+                             np.where(operations[:, PlayerOperation.RIGHT_IX], 1, 0)) * np.sign(speed)
+        allowed_rot = MAX_CAR_ROTATION * np.sqrt(np.abs(speed) / MAX_CAR_SPEED)
+        rotation = self.rotation[alive] + np.where(np.abs(speed) < MIN_SPEED, 0, allowed_rot * dt * turn_fact)
+
+        rot = np.radians(rotation)
+        cosine, sine = np.cos(rot), np.sin(rot)
+        x = self.x[alive] + cosine * speed * dt
+        y = self.y[alive] - sine * speed * dt
+
+        self.speed[alive], self.rotation[alive], self.x[alive], self.y[alive] = speed, rotation, x, y
+        self.boundaries[alive] = create_collision_boxes(CAR_COLL_BOX, x, y, cosine, sine)
+        self.__update_distances(alive)
+        self.__update_collisions(alive)
+
+    def __update_distances(self, cars):
+        outside_scores, inside_scores = self.__distance_tracker.get_deltas(cars, self.x[cars], self.y[cars])
+        self.distance[cars] += outside_scores + inside_scores
+
+    def __update_collisions(self, cars):
+        self.is_alive[cars] = self.track.contains_all(self.boundaries[cars])
+
+
 class PlayerState:
     EMPTY_DELTAS = ((0, (-100, -100)),) * 2
 
-    def __init__(self, level: Level):
+    __slots__ = ('x', 'y', 'rotation', 'speed', 'corners', 'is_alive', 'distance',
+                 '__rotation_matrix', '__boundaries', '__last_scores', '__distance_tracker')
+
+    def __init__(self, level: Level, fields: LevelFields = None):
         self.x, self.y, self.rotation = level.single_car.x, level.single_car.y, level.single_car.rot
         self.speed = 0
-        self.boundaries = Polygon(np.reshape(CAR_BOUND_POINTS, (-1, 2)))
+        self.corners = np.reshape(CAR_BOUND_POINTS, (-1, 2)).astype(float)
         self.is_alive = True
         self.distance = 0
-        self.last_deltas = self.EMPTY_DELTAS
-        self.__distance_tracker = DistanceTracker(level)
+        self.__rotation_matrix = np.empty((2, 2))
+        self.__boundaries = None
+        self.__last_scores = None
+        self.__distance_tracker = DistanceTracker(level, fields)
+
+    @property
+    def boundaries(self):
+        if self.__boundaries is None:
+            self.__boundaries = Polygon(self.corners)
+        return self.__boundaries
+
+    @property
+    def last_deltas(self):
+        if self.__last_scores is None:
+            return self.EMPTY_DELTAS
+        return tuple(zip(self.__last_scores, self.__distance_tracker.get_line_points()))
 
     @property
     def relevant_speed(self):
@@ -134,82 +219,157 @@ class PlayerState:
         cosine, sine = math.cos(rot), math.sin(rot)
         self.x += cosine * self.speed * dt
         self.y -= sine * self.speed * dt
-        self.boundaries = create_collision_box(CAR_COLL_BOX, self.x, self.y, cosine, sine)
+        create_collision_box(CAR_COLL_BOX, self.x, self.y, cosine, sine, self.__rotation_matrix, self.corners)
+        self.__boundaries = None
         self.__update_distance__()
 
     def __update_distance__(self):
-        deltas = self.__distance_tracker.get_deltas(self.x, self.y)
-        self.distance += deltas[0][0] + deltas[1][0]
-        self.last_deltas = deltas
+        self.__last_scores = self.__distance_tracker.get_deltas(self.x, self.y)
+        self.distance += self.__last_scores[0] + self.__last_scores[1]
 
     def flattened_boundaries(self):
-        return np.array(self.boundaries.exterior.coords[:-1]).flatten()
+        return self.corners.flatten()
 
 
 class Track:
-    def __init__(self, level: Level):
-        self.__outside = Polygon(np.reshape(level.outer_track, (-1, 2)))
-        self.__inside = Polygon(np.reshape(level.inner_track, (-1, 2)))
-        all_obstacles = create_obstacles_collision_boxes(level.obstacles)
-        self.__obstacles = list(filter(
-            lambda obs: self.__outside.intersects(obs) and not self.__inside.covers(obs),
-            all_obstacles))
-
-    def contains(self, geometry):
-        return self.__outside.contains(geometry) and \
-               not self.__inside.intersects(geometry) and \
-               not any([obs.intersects(geometry) for obs in self.__obstacles])
+    def __init__(self, level: Level, collision=DEFAULT_COLLISION, fields: LevelFields = None):
+        self.__fields = fields
+        if collision == SHAPELY_COLLISION:
+            self.__collision = ShapelyCollision(level)
+        elif collision == SEGMENT_COLLISION:
+            self.__collision = compile_level(level).collision
+        else:
+            raise RuntimeError('unknown collision backend: "{}"'.format(collision))
+
+    def contains(self, corners):
+        if self.__fields and self.__clear_of_walls(corners[np.newaxis])[0]:
+            return True
+        return self.__collision.contains(corners)
+
+    def contains_all(self, corners):
+        if not self.__fields:
+            return self.__collision.contains_all(corners)
+        contained = self.__clear_of_walls(corners)
+        near_walls = ~contained
+        if near_walls.any():
+            contained[near_walls] = self.__collision.contains_all(corners[near_walls])
+        return contained
+
+    def __clear_of_walls(self, corners):
+        center_x, center_y = np.mean(corners, axis=1).T
+        return self.__fields.clearance(center_x, center_y) > CAR_COLL_RADIUS
 
 
 class DistanceTracker:
-    def __init__(self, level: Level):
-        self.__outside_tracker = LineDistanceTracker(level.outer_track, level.outer_track_offset)
-        self.__inside_tracker = LineDistanceTracker(level.inner_track, level.inner_track_offset)
+    def __init__(self, level: Level, fields: LevelFields = None):
+        self.__fields = fields
+        compiled_level = compile_level(level)
+        self.__outside_tracker = LineDistanceTracker(compiled_level.outer_path, level.outer_track_offset)
+        self.__inside_tracker = LineDistanceTracker(compiled_level.inner_path, level.inner_track_offset)
 
     def get_deltas(self, x, y):
-        point = Point(x, y)
-        return self.__outside_tracker.get_delta(point), self.__inside_tracker.get_delta(point)
+        if self.__fields:
+            outside_dist, inside_dist = self.__fields.progress(x, y)
+            max_delta = FIELD_MAX_PROGRESS_STEP + 2 * self.__fields.lookup_error
+            return self.__outside_tracker.get_approximate_delta(x, y, outside_dist, max_delta), \
+                   self.__inside_tracker.get_approximate_delta(x, y, inside_dist, max_delta)
+        return self.__outside_tracker.get_delta(x, y), self.__inside_tracker.get_delta(x, y)
+
+    def get_line_points(self):
+        return self.__outside_tracker.line_point, self.__inside_tracker.line_point
 
 
 class LineDistanceTracker:
-    def __init__(self, track, offset):
-        self.__line = LinearRing(np.reshape(track, (-1, 2)))
+    def __init__(self, path: RingPath, offset):
+        self.__path = path
         self.__prev_d = offset
-        self.__line_length = np.round(self.__line.length)
+        self.__line_length = np.round(self.__path.length)
         self.__delta_limit = self.__line_length - 100
 
-    def get_delta(self, point):
-        dist = np.round(self.__line.project(point))
-        return self.__get_delta_score(dist), self.__get_line_point(dist)
+    def get_delta(self, x, y):
+        return self.get_delta_at(self.__path.project_point(x, y)[0])
+
+    def get_approximate_delta(self, x, y, line_dist, max_delta):
+        # progress fields jump wherever the closest ring segment switches, re-project exactly there
+        if abs(self.__wrapped_delta(np.round(line_dist))) > max_delta:
+            return self.get_delta(x, y)
+        return self.get_delta_at(line_dist)
+
+    def get_delta_at(self, line_dist):
+        return self.__get_delta_score(np.round(line_dist))
+
+    @property
+    def line_point(self):
+        return self.__path.interpolate(self.__prev_d)
 
     def __get_delta_score(self, dist):
+        delta_score = self.__wrapped_delta(dist)
+        self.__prev_d = dist
+        return delta_score
+
+    def __wrapped_delta(self, dist):
         delta_score = dist - self.__prev_d
         if delta_score < -self.__delta_limit:
             delta_score = self.__line_length - self.__prev_d + dist
         elif delta_score > self.__delta_limit:
             delta_score = -(self.__prev_d + self.__line_length - dist)
-        self.__prev_d = dist
         return delta_score
 
-    def __get_line_point(self, dist):
-        pts = self.__line.interpolate(dist)
-        return list(pts.coords)[0]
 
+class BatchDistanceTracker:
+    """ DistanceTracker of many cars, progress is projected for all alive cars at once """
 
-def create_collision_box(box, x, y, cosine, sine):
-    j = np.array([[cosine, sine], [-sine, cosine]])
-    new_boundaries = []
-    for ix in range(len(box)):
-        m = np.dot(j, box[ix])
-        moved = np.array((x, y)) + m.T
-        new_boundaries.append(moved)
-    return Polygon(new_boundaries)
+    def __init__(self, level: Level, car_count, fields: LevelFields = None):
+        self.__fields = fields
+        compiled_level = compile_level(level)
+        self.__outside_tracker = BatchLineDistanceTracker(compiled_level.outer_path, level.outer_track_offset, car_count)
+        self.__inside_tracker = BatchLineDistanceTracker(compiled_level.inner_path, level.inner_track_offset, car_count)
 
+    def get_deltas(self, cars, x, y):
+        points = np.column_stack((x, y))
+        if self.__fields:
+            outside_dist, inside_dist = self.__fields.progress(x, y)
+            max_delta = FIELD_MAX_PROGRESS_STEP + 2 * self.__fields.lookup_error
+            return self.__outside_tracker.get_approximate_deltas(cars, points, outside_dist, max_delta), \
+                   self.__inside_tracker.get_approximate_deltas(cars, points, inside_dist, max_delta)
+        return self.__outside_tracker.get_deltas(cars, points), self.__inside_tracker.get_deltas(cars, points)
+
+
+class BatchLineDistanceTracker:
+    def __init__(self, path: RingPath, offset, car_count):
+        self.__path = path
+        self.__prev_d = np.full(car_count, offset, dtype=float)
+        self.__line_length = np.round(self.__path.length)
+        self.__delta_limit = self.__line_length - 100
+
+    def get_deltas(self, cars, points):
+        return self.__get_delta_scores(cars, np.round(self.__path.project(points)))
+
+    def get_approximate_deltas(self, cars, points, line_dist, max_delta):
+        dist = np.round(line_dist)
+        jumped = np.abs(self.__wrapped_deltas(cars, dist)) > max_delta
+        if jumped.any():
+            dist[jumped] = np.round(self.__path.project(points[jumped]))
+        return self.__get_delta_scores(cars, dist)
+
+    def __get_delta_scores(self, cars, dist):
+        delta_scores = self.__wrapped_deltas(cars, dist)
+        self.__prev_d[cars] = dist
+        return delta_scores
+
+    def __wrapped_deltas(self, cars, dist):
+        prev_d = self.__prev_d[cars]
+        delta_scores = dist - prev_d
+        return np.where(delta_scores < -self.__delta_limit, self.__line_length - prev_d + dist,
+                        np.where(delta_scores > self.__delta_limit, -(prev_d + self.__line_length - dist),
+                                 delta_scores))
+
+
+def create_collision_box(box, x, y, cosine, sine, rotation_matrix=None, out=None):
+    j = np.empty((2, 2)) if rotation_matrix is None else rotation_matrix
+    j[0, 0], j[0, 1], j[1, 0], j[1, 1] = cosine, -sine, sine, cosine
+    corners = np.matmul(box, j, out=out)
+    corners[:, 0] += x
+    corners[:, 1] += y
+    return corners
 
-def create_obstacles_collision_boxes(obstacles):
-    collision_boxes = []
-    for pt in obstacles:
-        rot = math.radians(pt.rot)
-        cosine, sine = math.cos(rot), math.sin(rot)
-        collision_boxes.append(create_collision_box(BOX_COLL_BOX, pt.x, pt.y, cosine, sine))
-    return collision_boxes
@@ -1,10 +1,8 @@
 import math
-from functools import reduce
 
 import numpy as np
-from shapely.geometry import LineString
 
-from .racer_engine import create_obstacles_collision_boxes
+from .compiled_level import TRACER_CELL_SIZE, compile_level, create_tracer_lines
 from .tracks import Level
 
 DEG_15 = math.pi / 12
@@ -15,48 +13,33 @@ TRACE_LINE_ANGLES = [DEG_90, DEG_60, DEG_30, DEG_15, 0, -DEG_15, -DEG_30, -DEG_6
 
 
 class TracerLines:
-    def __init__(self, level: Level):
+    def __init__(self, level: Level, cell_size=TRACER_CELL_SIZE):
         self.trace_len = level.width
-        obstacle_coll_boxes = create_obstacles_collision_boxes(level.obstacles)
-        self.collision_boxes = [
-            LineString(np.reshape(level.outer_track, (-1, 2))),
-            LineString(np.reshape(level.inner_track, (-1, 2))),
-            *[LineString(coll_box.exterior.coords) for coll_box in obstacle_coll_boxes]
-        ]
+        self.trace_angles = np.array(TRACE_LINE_ANGLES)
+        self.collision_lines = compile_level(level).tracer_lines if cell_size == TRACER_CELL_SIZE \
+            else create_tracer_lines(level, cell_size)
 
     def get_trace_distances(self, pos, rotation_grad):
-        rot = math.radians(rotation_grad)
-        return [self.__closest_distance_on_line(pos, rot + angle) for angle in TRACE_LINE_ANGLES]
+        return self.get_all_trace_distances(np.array([pos]), np.array([rotation_grad]))[0].tolist()
+
+    def get_all_trace_distances(self, positions, rotations_grad):
+        trace_deltas = self.__trace_deltas(rotations_grad)
+        trace_fractions = self.__closest_fractions(positions, trace_deltas)
+        distances = trace_fractions * np.sum(np.abs(trace_deltas), axis=-1)
+        return np.where(np.isfinite(trace_fractions), distances, self.trace_len)
 
     def get_trace_points(self, pos, rotation_grad):
-        rot = math.radians(rotation_grad)
-        return [self.__closest_point_on_line(pos, rot + angle) for angle in TRACE_LINE_ANGLES]
-
-    def __closest_distance_on_line(self, pos, rot):
-        cross_pts = self.__cross_points_on_line(pos, rot)
-        if len(cross_pts) == 0:
-            return self.trace_len
-        return min(np.sum((np.abs(np.array(cross_pts) - pos)), axis=1))
-
-    def __closest_point_on_line(self, pos, rot):
-        cross_pts = self.__cross_points_on_line(pos, rot)
-        if len(cross_pts) == 0:
-            return pos
-        sq_distances = np.sum((np.array(cross_pts) - pos) ** 2, axis=1)
-        return cross_pts[np.argmin(sq_distances)]
-
-    def __cross_points_on_line(self, pos, rot):
-        trace_target = (pos[0] + math.cos(rot) * self.trace_len, pos[1] - math.sin(rot) * self.trace_len)
-        tracer = LineString([pos, trace_target])
-        intersections = [box.intersection(tracer) for box in self.collision_boxes]
-        candidates = reduce(lambda all_xs, curr_xs: all_xs.union(curr_xs), intersections)
-
-        cross_pts = []
-        if not candidates.is_empty:
-            if hasattr(candidates, 'geoms'):
-                for pts in getattr(candidates, 'geoms'):
-                    cross_pts.append((pts.x, pts.y))
-            else:
-                cross_pts.append((candidates.x, candidates.y))
-
-        return cross_pts
+        trace_deltas = self.__trace_deltas(np.array([rotation_grad]))
+        trace_fractions = self.__closest_fractions(np.array([pos]), trace_deltas)[0]
+        cross_pts = np.asarray(pos) + trace_fractions[:, np.newaxis] * trace_deltas[0]
+        return [tuple(cross_pt) if np.isfinite(fraction) else pos
+                for cross_pt, fraction in zip(cross_pts.tolist(), trace_fractions)]
+
+    def __trace_deltas(self, rotations_grad):
+        rot = np.radians(rotations_grad)[:, np.newaxis] + self.trace_angles
+        return np.stack((np.cos(rot), -np.sin(rot)), axis=-1) * self.trace_len
+
+    def __closest_fractions(self, positions, trace_deltas):
+        origins = np.repeat(positions, len(self.trace_angles), axis=0)
+        fractions = self.collision_lines.cast_rays(origins, np.reshape(trace_deltas, (-1, 2)))
+        return np.reshape(fractions, trace_deltas.shape[:-1])
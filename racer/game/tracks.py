@@ -182,7 +182,7 @@ class Trainings:
         self.__ix = -1
 
     def has_next(self):
-        return self.__ix < len(self.__entries)
+        return self.__ix + 1 < len(self.__entries)
 
     def reset(self):
         self.__ix = -1
@@ -190,3 +190,6 @@ class Trainings:
     def next(self):
         self.__ix += 1
         return self.__entries[self.__ix]
+
+    def entries(self):
+        return list(self.__entries)
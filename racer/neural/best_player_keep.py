@@ -26,6 +26,14 @@ class BestPlayerKeep:
         self.genome_keys = []
         self.min_ix = 0
 
+    def get_state(self):
+        return {'file_name': self.file_name, 'top_list': self.top_list,
+                'genome_keys': self.genome_keys, 'min_ix': self.min_ix}
+
+    def set_state(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+
     def add_population_result(self, population_result):
         if self.__top_list_updated(population_result):
             self.__store_top_list()
@@ -0,0 +1,308 @@
+import os
+import queue
+import socket
+import threading
+import time
+import traceback
+from collections import deque
+from itertools import count
+from multiprocessing import Pool
+from multiprocessing.connection import Listener, Client
+
+HEARTBEAT_INTERVAL = 2
+HEARTBEAT_TIMEOUT = 10
+CONNECT_RETRY_DELAY = 3
+# tasks are pickled functions: the key is all that keeps others from running code on coordinator and workers
+MIN_AUTHKEY_LENGTH = 16
+PLACEHOLDER_AUTHKEYS = {'racer', 'secret', 'password', 'changeme', 'authkey'}
+
+INIT_MSG, HELLO_MSG, TASK_MSG, RESULT_MSG, ERROR_MSG, HEARTBEAT_MSG, CLOSE_MSG = \
+    'init', 'hello', 'task', 'result', 'error', 'heartbeat', 'close'
+
+
+def parse_address(address):
+    host, port = address.rsplit(':', 1)
+    return host, int(port)
+
+
+def check_authkey(authkey):
+    if not authkey or authkey.strip().lower() in PLACEHOLDER_AUTHKEYS or len(authkey) < MIN_AUTHKEY_LENGTH:
+        raise RuntimeError('"coordinator_authkey" has to be a secret of at least {} characters'.format(
+            MIN_AUTHKEY_LENGTH))
+    return authkey.encode()
+
+
+class TaskError(RuntimeError):
+    pass
+
+
+class RemoteWorker:
+    def __init__(self, name, connection, processes):
+        self.name = name
+        self.connection = connection
+        self.processes = processes
+        self.running = {}
+        self.last_seen = time.monotonic()
+        self.alive = True
+        self.send_lock = threading.Lock()
+
+    @property
+    def free_slots(self):
+        return self.processes - len(self.running)
+
+    def send(self, message):
+        with self.send_lock:
+            self.connection.send(message)
+
+    def disconnect(self):
+        # wakes up the receiving thread blocked in recv, that thread closes the connection itself
+        try:
+            with socket.fromfd(self.connection.fileno(), socket.AF_INET, socket.SOCK_STREAM) as sock:
+                sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+
+class DistributedPool:
+    """ multiprocessing.Pool replacement, tasks are evaluated by workers connecting over TCP """
+
+    def __init__(self, address, authkey, initializer=None, initargs=(), steal_tasks=False):
+        self.initializer = initializer
+        self.initargs = initargs
+        self.steal_tasks = steal_tasks
+        self.__listener = Listener(parse_address(address), authkey=check_authkey(authkey))
+        self.__lock = threading.Condition()
+        self.__workers = []
+        self.__pending = deque()
+        self.__tasks = {}
+        self.__task_ids = count()
+        self.__closed = False
+        print('coordinator listening on: {}'.format(self.address))
+
+        threading.Thread(target=self.__accept_workers, daemon=True).start()
+        threading.Thread(target=self.__check_heartbeats, daemon=True).start()
+
+    @property
+    def address(self):
+        return '{}:{}'.format(*self.__listener.address)
+
+    @property
+    def worker_count(self):
+        with self.__lock:
+            return len(self.__workers)
+
+    def imap_unordered(self, function, iterable, chunksize=1):
+        results = queue.Queue()
+        task_count = self.__submit(function, [(item,) for item in iterable], results)
+        for _ in range(task_count):
+            _, result = self.__next_result(results)
+            yield result
+
+    def map(self, function, iterable, chunksize=None):
+        return self.starmap(function, [(item,) for item in iterable])
+
+    def starmap(self, function, iterable, chunksize=None):
+        results = queue.Queue()
+        task_count = self.__submit(function, list(iterable), results)
+        ordered = [None] * task_count
+        for _ in range(task_count):
+            ix, result = self.__next_result(results)
+            ordered[ix] = result
+        return ordered
+
+    def close(self):
+        with self.__lock:
+            self.__closed = True
+            workers = list(self.__workers)
+        for worker in workers:
+            try:
+                worker.send((CLOSE_MSG,))
+            except OSError:
+                pass
+        self.__listener.close()
+
+    def join(self):
+        # tasks of a closed pool without workers never finish
+        with self.__lock:
+            self.__lock.wait_for(lambda: not self.__tasks or (self.__closed and not self.__workers),
+                                 timeout=HEARTBEAT_TIMEOUT)
+
+    def terminate(self):
+        self.close()
+
+    @staticmethod
+    def __next_result(results):
+        ix, success, result = results.get()
+        if not success:
+            raise TaskError(result)
+        return ix, result
+
+    def __submit(self, function, params, results):
+        with self.__lock:
+            for ix, args in enumerate(params):
+                task_id = next(self.__task_ids)
+                self.__tasks[task_id] = (ix, function, args, results)
+                self.__pending.append(task_id)
+            self.__dispatch()
+        return len(params)
+
+    def __dispatch(self):
+        for worker in self.__workers:
+            while worker.alive and worker.free_slots > 0:
+                if self.__pending:
+                    task_id = self.__pending.popleft()
+                else:
+                    task_id = self.__steal_task(worker) if self.steal_tasks else None
+                if task_id is None:
+                    break
+                self.__send_task(worker, task_id)
+
+    def __steal_task(self, idle_worker):
+        # idle workers run a copy of the oldest task still running elsewhere, the first result wins
+        running_elsewhere = [(started, task_id) for worker in self.__workers if worker is not idle_worker
+                             for task_id, started in worker.running.items() if task_id in self.__tasks
+                             and not any(task_id in other.running for other in self.__workers
+                                         if other is not worker)]
+        return min(running_elsewhere)[1] if running_elsewhere else None
+
+    def __send_task(self, worker, task_id):
+        _, function, args, _ = self.__tasks[task_id]
+        worker.running[task_id] = time.monotonic()
+        try:
+            worker.send((TASK_MSG, task_id, function, args))
+        except OSError:
+            # its tasks are re-queued once the receiving thread or the heartbeat check drops the worker
+            worker.alive = False
+
+    def __accept_workers(self):
+        while not self.__closed:
+            try:
+                connection = self.__listener.accept()
+                connection.send((INIT_MSG, self.initializer, self.initargs))
+                _, name, processes = connection.recv()
+            except (OSError, EOFError):
+                if self.__closed:
+                    return
+                continue
+            except Exception as ex:
+                print('worker connection refused:', ex)
+                continue
+            worker = RemoteWorker(name, connection, processes)
+            with self.__lock:
+                self.__workers.append(worker)
+                self.__dispatch()
+            print('worker joined: {} ({} processes)'.format(name, processes))
+            threading.Thread(target=self.__receive, args=(worker,), daemon=True).start()
+
+    def __receive(self, worker):
+        try:
+            while True:
+                message = worker.connection.recv()
+                worker.last_seen = time.monotonic()
+                if message[0] in (RESULT_MSG, ERROR_MSG):
+                    self.__complete(worker, *message)
+        except (OSError, EOFError):
+            pass
+        with self.__lock:
+            self.__remove_worker(worker)
+        worker.connection.close()
+
+    def __complete(self, worker, message_type, task_id, result):
+        with self.__lock:
+            # copies still running elsewhere keep their slot until their late result arrives and is ignored
+            worker.running.pop(task_id, None)
+            if task_id in self.__tasks:
+                ix, _, _, results = self.__tasks.pop(task_id)
+                results.put((ix, message_type == RESULT_MSG, result))
+                self.__lock.notify_all()
+            self.__dispatch()
+
+    def __remove_worker(self, worker):
+        if worker not in self.__workers:
+            return
+        worker.alive = False
+        self.__workers.remove(worker)
+        worker.disconnect()
+        requeued = [task_id for task_id in worker.running if task_id in self.__tasks
+                    and not any(task_id in other.running for other in self.__workers)]
+        self.__pending.extendleft(reversed(requeued))
+        worker.running.clear()
+        if not self.__closed:
+            print('worker lost: {} ({} tasks re-queued)'.format(worker.name, len(requeued)))
+        self.__lock.notify_all()
+        self.__dispatch()
+
+    def __check_heartbeats(self):
+        while not self.__closed:
+            time.sleep(HEARTBEAT_INTERVAL)
+            with self.__lock:
+                now = time.monotonic()
+                for worker in list(self.__workers):
+                    if now - worker.last_seen > HEARTBEAT_TIMEOUT:
+                        self.__remove_worker(worker)
+
+
+def run_worker(address, authkey, processes=None):
+    authkey = check_authkey(authkey)
+    processes = processes if processes else os.cpu_count()
+    name = '{}:{}'.format(os.uname().nodename, os.getpid())
+    while True:
+        try:
+            connection = Client(parse_address(address), authkey=authkey)
+        except ConnectionRefusedError:
+            time.sleep(CONNECT_RETRY_DELAY)
+            continue
+        print('connected to coordinator: {}'.format(address))
+        if __serve_coordinator(connection, name, processes):
+            return
+        print('coordinator connection lost, reconnecting')
+
+
+def __serve_coordinator(connection, name, processes):
+    send_lock = threading.Lock()
+    stopped = threading.Event()
+
+    def send(message):
+        with send_lock:
+            try:
+                connection.send(message)
+            except OSError:
+                stopped.set()
+
+    def heartbeat():
+        while not stopped.wait(HEARTBEAT_INTERVAL):
+            send((HEARTBEAT_MSG,))
+
+    def task_error(task_id):
+        return lambda ex: send((ERROR_MSG, task_id, ''.join(traceback.format_exception(type(ex), ex, None))))
+
+    try:
+        _, initializer, initargs = connection.recv()
+        connection.send((HELLO_MSG, name, processes))
+    except (OSError, EOFError):
+        return False
+
+    pool = Pool(processes=processes, initializer=initializer, initargs=initargs)
+    threading.Thread(target=heartbeat, daemon=True).start()
+    closed = False
+    try:
+        while True:
+            message = connection.recv()
+            if message[0] == CLOSE_MSG:
+                closed = True
+                return True
+            _, task_id, function, args = message
+            pool.apply_async(function, args,
+                             callback=lambda result, task_id=task_id: send((RESULT_MSG, task_id, result)),
+                             error_callback=task_error(task_id))
+    except (OSError, EOFError):
+        return False
+    finally:
+        stopped.set()
+        if closed:
+            # pool processes run their exit handlers on a regular shutdown
+            pool.close()
+            pool.join()
+        else:
+            pool.terminate()
+        connection.close()
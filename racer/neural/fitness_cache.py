@@ -0,0 +1,89 @@
+import hashlib
+
+FITNESS_CACHE_SIZE = 200000
+
+
+def genome_hash(genome):
+    nodes = sorted((key, ng.bias, ng.response, ng.activation, ng.aggregation) for key, ng in genome.nodes.items())
+    connections = sorted((cg.key, cg.weight) for cg in genome.connections.values() if cg.enabled)
+    return hashlib.sha1(repr((nodes, connections)).encode()).hexdigest()
+
+
+class FitnessCache:
+    def __init__(self, eval_seed, max_size=FITNESS_CACHE_SIZE):
+        self.eval_seed = eval_seed
+        self.max_size = max_size
+        self.__fitness = {}
+        self.hits, self.misses = 0, 0
+
+    @staticmethod
+    def key(genome, level):
+        return genome_hash(genome), level.name
+
+    def seed(self, key):
+        seed_text = '{}:{}:{}'.format(self.eval_seed, *key)
+        return int(hashlib.sha1(seed_text.encode()).hexdigest()[:16], 16)
+
+    def evaluate(self, genomes, level, evaluate_seeded):
+        keys = [self.key(genome, level) for genome in genomes]
+        fitness = {key: self.__fitness[key] for key in keys if key in self.__fitness}
+        # duplicates within a generation are evaluated once
+        missing = {key: genome for key, genome in zip(keys, genomes) if key not in fitness}
+        self.hits += len(genomes) - len(missing)
+        self.misses += len(missing)
+
+        if missing:
+            missing_keys = list(missing)
+            results = evaluate_seeded(list(missing.values()), seeds=[self.seed(key) for key in missing_keys])
+            fitness.update(zip(missing_keys, results))
+            self.__store(zip(missing_keys, results))
+        return [fitness[key] for key in keys]
+
+    def evaluate_curriculum(self, genomes, levels, evaluate_seeded):
+        genome_keys = [genome_hash(genome) for genome in genomes]
+        results = [self.__cached_curriculum(genome_key, levels) for genome_key in genome_keys]
+        evaluated_count = 0
+
+        # duplicates within a generation are evaluated once
+        pending = {}
+        for genome, genome_key, cached in zip(genomes, genome_keys, results):
+            if not passed_curriculum_end(cached, levels):
+                pending.setdefault((genome_key, len(cached)), genome)
+        if pending:
+            pending_keys = list(pending)
+            starts = [start for _, start in pending_keys]
+            seeds = [[self.seed((genome_key, level.name)) for level, _ in levels[start:]]
+                     for genome_key, start in pending_keys]
+            evaluated = dict(zip(pending_keys, evaluate_seeded(list(pending.values()), starts=starts, seeds=seeds)))
+            for (genome_key, start), level_results in evaluated.items():
+                evaluated_count += len(level_results)
+                self.__store(((genome_key, level.name), fitness)
+                             for (level, _), fitness in zip(levels[start:], level_results))
+            for genome_key, cached in zip(genome_keys, results):
+                cached.extend(evaluated.get((genome_key, len(cached)), []))
+        self.hits += sum(len(level_results) for level_results in results) - evaluated_count
+        self.misses += evaluated_count
+        return results
+
+    def __cached_curriculum(self, genome_key, levels):
+        cached = []
+        for level, limit in levels:
+            fitness = self.__fitness.get((genome_key, level.name))
+            if fitness is None:
+                break
+            cached.append(fitness)
+            if fitness < limit:
+                break
+        return cached
+
+    def __store(self, key_fitness):
+        self.__fitness.update(key_fitness)
+        overflow = len(self.__fitness) - self.max_size
+        if overflow > 0:
+            for key in list(self.__fitness)[:overflow]:
+                del self.__fitness[key]
+
+
+def passed_curriculum_end(level_results, levels):
+    failed = len(level_results) and level_results[-1] < levels[len(level_results) - 1][1]
+    return failed or len(level_results) == len(levels)
@@ -0,0 +1,80 @@
+from signal import signal, SIGINT
+
+import numpy as np
+
+from game.compiled_level import compile_level
+from game.racer_engine import BatchRacerEngine, PlayerOperation
+from game.tracers import TracerLines
+from .layered_network import LayeredNetwork, NetworkBatch
+from .neural_player import NeuralPlayer, ScoreHistory, MIN_SCORE_PER_SECOND, MIN_SPS_OFFSET
+from .training_dts import DtSampler
+
+
+class LockstepEvaluator:
+    @staticmethod
+    def evaluate_genomes(genomes, neat_config, level, limit, field_resolution=0, seeds=None):
+        if NeuralPlayer.STOPPING:
+            return [0] * len(genomes)
+
+        signal(SIGINT, NeuralPlayer.sigint_received)
+        dt_samplers = [DtSampler(seed) for seed in seeds] if seeds else [DtSampler() for _ in genomes]
+        return LockstepEvaluator(genomes, neat_config, level, limit, field_resolution).__evaluate(dt_samplers)
+
+    def __init__(self, genomes, config, level, limit, field_resolution=0):
+        car_count = len(genomes)
+        fields = compile_level(level).fields(field_resolution) if field_resolution else None
+        self.engine = BatchRacerEngine(level, car_count, fields)
+        self.tracers = TracerLines(level)
+        self.nets = NetworkBatch([LayeredNetwork.create(genome, config) for genome in genomes])
+        self.operations = np.zeros((car_count, 4), dtype=bool)
+        self.time = np.zeros(car_count)
+        self.score = np.zeros(car_count)
+        self.score_limit = limit
+        self.score_histories = [ScoreHistory() for _ in range(car_count)]
+
+    def __evaluate(self, dt_samplers):
+        while not (self.engine.game_over or NeuralPlayer.STOPPING):
+            alive = np.flatnonzero(self.engine.is_alive)
+            dts = np.zeros(self.engine.car_count)
+            dts[alive] = [dt_samplers[car].next_dt() for car in alive]
+            self.next_step(dts)
+        fitness = np.where(self.__under_sps_limit(), self.score / 2, self.score)
+        return [round(car_fitness) for car_fitness in fitness.tolist()]
+
+    def next_step(self, dts):
+        cars = np.flatnonzero(self.engine.is_alive)
+        self.time[cars] += dts[cars]
+        engine = self.engine
+        net_input = self.tracers.get_all_trace_distances(
+            np.column_stack((engine.x[cars], engine.y[cars])), engine.rotation[cars])
+        net_output = self.nets.activate_all(net_input, cars)
+
+        self.__update_operations(cars, net_output)
+        engine.update(dts, self.operations)
+        self.score[cars] = engine.distance[cars] // 10
+
+        for car in cars:
+            if not self.score_histories[car].changed_score(dts[car], self.score[car]):
+                self.score[car] /= 2
+                engine.stop(car)
+
+        game_over = self.__under_sps_limit() | self.__score_out_of_bounds()
+        engine.stop(cars[game_over[cars]])
+
+    def __update_operations(self, cars, net_output):
+        fwd, back, left, right = net_output.T
+        moving, turning = (fwd > 0.5) | (back > 0.5), (left > 0.5) | (right > 0.5)
+        self.operations[cars, PlayerOperation.FWD_IX] = moving & (fwd > back)
+        self.operations[cars, PlayerOperation.REV_IX] = moving & ~(fwd > back)
+        self.operations[cars, PlayerOperation.LEFT_IX] = turning & (left > right)
+        self.operations[cars, PlayerOperation.RIGHT_IX] = turning & ~(left > right)
+
+    def __score_out_of_bounds(self):
+        out_of_bounds = self.score < 0
+        if self.score_limit:
+            out_of_bounds |= self.score >= self.score_limit
+        return out_of_bounds
+
+    def __under_sps_limit(self):
+        score_per_second = self.score / np.maximum(self.time, MIN_SPS_OFFSET)
+        return (self.time > MIN_SPS_OFFSET) & (score_per_second < MIN_SCORE_PER_SECOND)
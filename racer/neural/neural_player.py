@@ -1,10 +1,15 @@
+import time
 from signal import signal, SIGINT
 
 import neat
 
+from game.compiled_level import compile_level
 from game.racer_engine import RacerEngine, PlayerOperation
 from game.tracers import TracerLines
-from .training_dts import random_dt
+from neat_common.genome_codec import as_genome
+from neat_common.source_network import create_source_network
+from .layered_network import LayeredNetwork
+from .training_dts import DtSampler
 
 MIN_SCORE_PER_SECOND = 20
 MIN_SPS_OFFSET = 3
@@ -12,6 +17,15 @@ MIN_SPS_OFFSET = 3
 SCORE_CHECK_TIME = 2
 SCORE_CHECK_DIFF = 4
 
+NEAT_NETWORK = 'neat'
+LAYERED_NETWORK = 'layered'
+SOURCE_NETWORK = 'source'
+NETWORKS = {
+    NEAT_NETWORK: neat.nn.FeedForwardNetwork.create,
+    LAYERED_NETWORK: LayeredNetwork.create,
+    SOURCE_NETWORK: create_source_network
+}
+
 
 class NeuralPlayer:
     STOPPING = False
@@ -21,30 +35,38 @@ class NeuralPlayer:
         NeuralPlayer.STOPPING = True
 
     @staticmethod
-    def evaluate_genome(genome, neat_config, level, limit):
+    def evaluate_genome(genome, neat_config, level, limit, field_resolution=0, network=NEAT_NETWORK, seed=None,
+                        recorder=None, timing=None):
         if NeuralPlayer.STOPPING:
             return 0
 
         signal(SIGINT, NeuralPlayer.sigint_received)
-        return NeuralPlayer(genome, neat_config, level, limit).__evaluate()
+        return NeuralPlayer(genome, neat_config, level, limit, field_resolution=field_resolution, network=network,
+                            recorder=recorder, timing=timing).__evaluate(DtSampler(seed))
 
-    def __init__(self, genome, config, level, limit, name=None):
+    def __init__(self, genome, config, level, limit, name=None, field_resolution=0, network=NEAT_NETWORK,
+                 recorder=None, timing=None):
         self.name = name if name else '{}'.format(genome.key)
-        self.engine = RacerEngine(level)
+        fields = compile_level(level).fields(field_resolution) if field_resolution else None
+        self.engine = RacerEngine(level, fields)
         self.tracers = TracerLines(level)
-        self.net = neat.nn.FeedForwardNetwork.create(genome, config)
+        self.net = create_network(genome, config, network)
         self.operations = PlayerOperation()
         self.time = 0
         self.score = 0
         self.score_limit = limit
         self.score_history = ScoreHistory()
+        self.recorder = recorder
+        self.timing = timing
+        if recorder:
+            recorder.record(0, self.engine.player_state, 0)
 
     def get_state(self):
         return self.engine.player_state
 
-    def __evaluate(self):
+    def __evaluate(self, dt_sampler):
         while not (self.engine.game_over or NeuralPlayer.STOPPING):
-            dt = random_dt()
+            dt = dt_sampler.next_dt()
             self.next_step(dt)
         fitness = self.score
         if self.__under_sps_limit():
@@ -53,12 +75,34 @@ class NeuralPlayer:
 
     def next_step(self, dt):
         self.time += dt
+        if self.timing:
+            net_input = self.__timed_step(dt)
+        else:
+            net_input = self.__sense()
+            self.__update_operations(*self.net.activate(net_input))
+            self.engine.update(dt, self.operations)
+            self.__update_score(dt)
+        if self.recorder:
+            self.recorder.record(self.time, self.engine.player_state, self.score, net_input)
+
+    def __timed_step(self, dt):
+        start = time.perf_counter()
+        net_input = self.__sense()
+        sensed = time.perf_counter()
+        self.__update_operations(*self.net.activate(net_input))
+        activated = time.perf_counter()
+        self.engine.update(dt, self.operations)
+        moved = time.perf_counter()
+        self.__update_score(dt)
+        scored = time.perf_counter()
+        self.timing.add(sensed - start, activated - sensed, moved - activated, scored - moved)
+        return net_input
+
+    def __sense(self):
         state = self.engine.player_state
-        net_input = self.tracers.get_trace_distances((state.x, state.y), state.rotation)
-        net_output = self.net.activate(net_input)
+        return self.tracers.get_trace_distances((state.x, state.y), state.rotation)
 
-        self.__update_operations(*net_output)
-        self.engine.update(dt, self.operations)
+    def __update_score(self, dt):
         self.score = self.engine.player_state.distance // 10
 
         if not self.score_history.changed_score(dt, self.score):
@@ -107,3 +151,11 @@ class ScoreHistory:
                 return False
             self.prev_score = score
         return True
+
+
+def create_network(genome, config, network=NEAT_NETWORK):
+    if network not in NETWORKS:
+        raise RuntimeError('unknown network: "{}"'.format(network))
+    if network == NEAT_NETWORK:
+        genome = as_genome(genome, config.genome_config)
+    return NETWORKS[network](genome, config)
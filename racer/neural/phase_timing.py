@@ -0,0 +1,39 @@
+PHASES = ('sensors', 'network', 'physics', 'scoring')
+PHASE_FMT = '{} {:.2f}s ({:.0%})'
+
+
+class PhaseTiming:
+    """ accumulated time and step count of the NeuralPlayer.next_step phases """
+
+    def __init__(self):
+        self.steps = 0
+        self.times = [0.0] * len(PHASES)
+
+    def add(self, sensors, network, physics, scoring):
+        times = self.times
+        times[0] += sensors
+        times[1] += network
+        times[2] += physics
+        times[3] += scoring
+        self.steps += 1
+
+    def merge(self, other):
+        self.steps += other.steps
+        self.times = [time + other_time for time, other_time in zip(self.times, other.times)]
+
+    def reset(self):
+        self.steps = 0
+        self.times = [0.0] * len(PHASES)
+
+    @property
+    def total(self):
+        return sum(self.times)
+
+    def text(self, wall_time):
+        total = self.total
+        if not self.steps or not total:
+            return 'Phase times: no steps timed'
+        phases = ', '.join(PHASE_FMT.format(phase, time, time / total) for phase, time in zip(PHASES, self.times))
+        # steps/s of the processes' step time vs. of the wall time: the gap is spent outside of next_step
+        return 'Phase times: {:,} steps in {:.2f}s, {:,.0f} steps/s per process, {:,.0f} steps/s in {:.2f}s wall time, ' \
+               '{}'.format(self.steps, total, self.steps / total, self.steps / wall_time, wall_time, phases)
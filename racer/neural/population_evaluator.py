@@ -0,0 +1,142 @@
+from functools import partial
+
+from game.tracks import Trainings
+from neat_common.genome_codec import encode_genome
+from neat_common.runtime_scheduler import RuntimeScheduler
+from .fitness_cache import FitnessCache
+from .training_worker import evaluate_genome, evaluate_lockstep, evaluate_curriculum
+
+LEVEL_COUNT_FMT = '[{:>9}]: {:2}'
+
+
+class PopulationEvaluator:
+    """ evaluates the genomes of a generation on the training levels with a process pool, without a display """
+
+    def __init__(self, neat_config, training_config, pool, phase_timing=None):
+        self.neat_config = neat_config
+        self.training_config = training_config
+        self.pool = pool
+        self.phase_timing = phase_timing
+        self.trainings = Trainings()
+        self.fitness_cache = FitnessCache(training_config.eval_seed) if training_config.deterministic else None
+        self.scheduler = RuntimeScheduler(pool)
+        self.trajectories = {}
+        self.generation = 0
+
+    def evaluate(self, genomes, generation=0):
+        for genome in genomes:
+            genome.fitness = 0
+        self.scheduler.next_generation()
+        self.trajectories = {}
+        self.generation = generation
+
+        if self.training_config.curriculum_tasks:
+            level_ix, passing_counts = self.evaluate_curricula(genomes)
+        else:
+            level_ix, passing_counts = self.evaluate_levels(genomes)
+
+        print(' '.join(passing_counts))
+        if self.scheduler.task_count:
+            print(self.scheduler.task_times_text())
+        if self.fitness_cache:
+            print('Fitness cache: {} hits, {} evaluated'.format(self.fitness_cache.hits, self.fitness_cache.misses))
+            self.fitness_cache.hits, self.fitness_cache.misses = 0, 0
+        return level_ix
+
+    def evaluate_levels(self, genomes):
+        remaining_genomes = list(genomes)
+        level_ix = 0
+        passing_counts = ['Levels passed:']
+        self.trainings.reset()
+        while len(remaining_genomes) and self.trainings.has_next():
+            level, limit = self.trainings.next()
+            remaining_genomes = self.evaluate_genomes_passing(remaining_genomes, level_ix, level, limit)
+            passing_counts.append(LEVEL_COUNT_FMT.format(level.name, len(remaining_genomes)))
+            level_ix += 1
+        return level_ix, passing_counts
+
+    def evaluate_curricula(self, genomes):
+        levels = self.trainings.entries()
+        if self.fitness_cache:
+            curriculum_results = self.fitness_cache.evaluate_curriculum(genomes, levels, self.evaluate_curriculum_tasks)
+        else:
+            curriculum_results = self.evaluate_curriculum_tasks(genomes)
+
+        for genome, level_results in zip(genomes, curriculum_results):
+            genome.fitness += sum(level_results)
+
+        level_ix = max(len(level_results) for level_results in curriculum_results)
+        passing_counts = ['Levels passed:']
+        for ix, (level, limit) in enumerate(levels[:level_ix]):
+            passing_count = sum(len(level_results) > ix and level_results[ix] >= limit
+                                for level_results in curriculum_results)
+            passing_counts.append(LEVEL_COUNT_FMT.format(level.name, passing_count))
+        return level_ix, passing_counts
+
+    def evaluate_curriculum_tasks(self, genomes, starts=None, seeds=None):
+        starts = starts if starts else [0] * len(genomes)
+        seeds = seeds if seeds else [None] * len(genomes)
+        genome_keys = [genome.key for genome in genomes]
+        generations = [self.generation] * len(genomes)
+        curriculum_results = self.scheduler.starmap(evaluate_curriculum, genome_keys, 'curriculum',
+                                                    zip(self.__encode(genomes), starts, seeds, generations))
+        if self.phase_timing:
+            curriculum_results = self.__keep_phase_timings(curriculum_results)
+        if self.training_config.record_trajectories:
+            return [self.__keep_trajectories(level_results) for level_results in curriculum_results]
+        return curriculum_results
+
+    def evaluate_genomes_passing(self, genomes, level_ix, level, limit):
+        passing_genomes = []
+        if self.fitness_cache:
+            evaluate_seeded = partial(self.evaluate_genomes, level_ix=level_ix)
+            eval_result = self.fitness_cache.evaluate(genomes, level, evaluate_seeded)
+        else:
+            eval_result = self.evaluate_genomes(genomes, level_ix)
+
+        for fitness, genome in zip(eval_result, genomes):
+            genome.fitness += fitness
+            if fitness >= limit:
+                passing_genomes.append(genome)
+        return passing_genomes
+
+    def evaluate_genomes(self, genomes, level_ix, seeds=None):
+        if self.training_config.lockstep:
+            return self.evaluate_lockstep(genomes, level_ix, seeds)
+
+        seeds = seeds if seeds else [None] * len(genomes)
+        genome_keys = [genome.key for genome in genomes]
+        generations = [self.generation] * len(genomes)
+        eval_result = self.scheduler.starmap(evaluate_genome, genome_keys, level_ix,
+                                             zip(self.__encode(genomes), [level_ix] * len(genomes), seeds, generations))
+        if self.phase_timing:
+            eval_result = self.__keep_phase_timings(eval_result)
+        if self.training_config.record_trajectories:
+            return self.__keep_trajectories(eval_result)
+        return eval_result
+
+    def evaluate_lockstep(self, genomes, level_ix, seeds=None):
+        batch_count = min(self.training_config.processes, len(genomes))
+        genome_data = self.__encode(genomes)
+        batches = [genome_data[ix::batch_count] for ix in range(batch_count)]
+        batch_seeds = [seeds[ix::batch_count] if seeds else None for ix in range(batch_count)]
+        eval_params = [(batch, level_ix, batch_seed) for batch, batch_seed in zip(batches, batch_seeds)]
+        batch_results = self.pool.starmap(evaluate_lockstep, eval_params)
+
+        eval_result = [0] * len(genomes)
+        for ix, batch_result in enumerate(batch_results):
+            eval_result[ix::batch_count] = batch_result
+        return eval_result
+
+    def __keep_trajectories(self, recorded_results):
+        for _, trajectory in recorded_results:
+            self.trajectories[(trajectory.genome_key, trajectory.level_name)] = trajectory
+        return [fitness for fitness, _ in recorded_results]
+
+    def __keep_phase_timings(self, timed_results):
+        for _, phase_timing in timed_results:
+            self.phase_timing.merge(phase_timing)
+        return [result for result, _ in timed_results]
+
+    def __encode(self, genomes):
+        return [encode_genome(genome, self.neat_config.genome_config) for genome in genomes]
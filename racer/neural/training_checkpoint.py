@@ -0,0 +1,118 @@
+import copy
+import os
+import pickle
+import random
+import threading
+from datetime import datetime
+from itertools import count
+
+import neat
+import numpy as np
+
+LOCAL_DIR = os.path.dirname(__file__)
+CHECKPOINTS_DIR = os.path.join(LOCAL_DIR, '..', 'checkpoints')
+
+
+def create_checkpoint_file_name():
+    if not os.path.exists(CHECKPOINTS_DIR):
+        os.mkdir(CHECKPOINTS_DIR)
+    ts = datetime.now().strftime('%Y%m%d-%H%M%S')
+    return os.path.join(CHECKPOINTS_DIR, '{}_training.cp'.format(ts))
+
+
+def counter_value(counter):
+    # next value of an itertools.count without advancing it, its repr is the only accessor
+    return int(repr(counter)[len('count('):-1])
+
+
+class TrainingCheckpoint(neat.reporting.BaseReporter):
+    """ the training state is copied on the training thread every every_gen generations and when stopped,
+        it is pickled and written by a background thread """
+
+    def __init__(self, every_gen, population: neat.Population, reporter, best_keep):
+        self.every_gen = every_gen
+        self.population = population
+        self.reporter = reporter
+        self.best_keep = best_keep
+        self.file_name = create_checkpoint_file_name()
+        # generation a resumed training starts with, None while the population is reproduced
+        self.__boundary = population.generation
+        self.__written_generation = None
+        self.__writer = None
+
+    def post_evaluate(self, config, population, species_set, best_genome):
+        self.__boundary = None
+
+    def end_generation(self, config, population, species_set):
+        self.__boundary = self.population.generation + 1
+        if self.every_gen and self.__boundary % self.every_gen == 0:
+            self.write()
+
+    def write(self):
+        # stopped while reproducing: the population is inconsistent, the last written checkpoint is kept
+        if self.__boundary is None or self.__boundary == self.__written_generation:
+            return
+        state = copy.deepcopy(self.__training_state())
+        self.wait()
+        self.__written_generation = self.__boundary
+        self.__writer = threading.Thread(target=self.__write_file, args=(state,))
+        self.__writer.start()
+
+    def wait(self):
+        if self.__writer:
+            self.__writer.join()
+            self.__writer = None
+
+    def flush(self):
+        self.write()
+        self.wait()
+
+    def __write_file(self, state):
+        temp_file = self.file_name + '.tmp'
+        with open(temp_file, 'wb') as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_file, self.file_name)
+
+    def __training_state(self):
+        species_set, reproduction = self.population.species, self.population.reproduction
+        node_indexer = self.population.config.genome_config.node_indexer
+        return {
+            'generation': self.__boundary,
+            'population': self.population.population,
+            'species': species_set.species,
+            'genome_to_species': species_set.genome_to_species,
+            'species_index': counter_value(species_set.indexer),
+            'genome_index': counter_value(reproduction.genome_indexer),
+            'node_index': counter_value(node_indexer) if node_indexer is not None else None,
+            'ancestors': reproduction.ancestors,
+            'best_genome': self.population.best_genome,
+            'random_state': random.getstate(),
+            'np_random_state': np.random.get_state(),
+            'reporter': self.reporter.get_state(),
+            'best_keep': self.best_keep.get_state()
+        }
+
+
+def load_checkpoint(file_name, config, reporter, best_keep):
+    with open(file_name, 'rb') as f:
+        state = pickle.load(f)
+    print('checkpoint read: {} (generation {})'.format(file_name, state['generation']))
+
+    species_set = config.species_set_type(config.species_set_config, None)
+    species_set.species, species_set.genome_to_species = state['species'], state['genome_to_species']
+    species_set.indexer = count(state['species_index'])
+    population = neat.Population(config, (state['population'], species_set, state['generation']))
+    species_set.reporters = population.reporters
+    population.reproduction.genome_indexer = count(state['genome_index'])
+    population.reproduction.ancestors = state['ancestors']
+    if state['node_index'] is not None:
+        config.genome_config.node_indexer = count(state['node_index'])
+    population.best_genome = state['best_genome']
+
+    random.setstate(state['random_state'])
+    np.random.set_state(state['np_random_state'])
+    reporter.set_state(state['reporter'])
+    best_keep.set_state(state['best_keep'])
+    return population
@@ -30,3 +30,27 @@ class TrainingConfig:
         self.keep_fitness_threshold = parameters.getint(self.SECTION, 'keep_fitness_threshold')
         self.showcase_batch_size = parameters.getint(self.SECTION, 'showcase_every_gen')
         self.showcase_racer_count = parameters.getint(self.SECTION, 'showcase_racer_count')
+        self.field_resolution = parameters.getint(self.SECTION, 'field_resolution', fallback=0)
+        self.network = parameters.get(self.SECTION, 'network', fallback='neat')
+        self.lockstep = parameters.getboolean(self.SECTION, 'lockstep', fallback=False)
+        self.curriculum_tasks = parameters.getboolean(self.SECTION, 'curriculum_tasks', fallback=False)
+        self.deterministic = parameters.getboolean(self.SECTION, 'deterministic', fallback=False)
+        self.eval_seed = parameters.getint(self.SECTION, 'eval_seed', fallback=0)
+        self.record_trajectories = parameters.getboolean(self.SECTION, 'record_trajectories', fallback=False)
+        self.record_sensors = parameters.getboolean(self.SECTION, 'record_sensors', fallback=False)
+        self.phase_timing = parameters.getboolean(self.SECTION, 'phase_timing', fallback=False)
+        self.trajectory_archive = parameters.get(self.SECTION, 'trajectory_archive', fallback='')
+        self.checkpoint_every_gen = parameters.getint(self.SECTION, 'checkpoint_every_gen', fallback=0)
+        self.coordinator_address = parameters.get(self.SECTION, 'coordinator_address', fallback='')
+        self.coordinator_authkey = parameters.get(self.SECTION, 'coordinator_authkey', fallback='')
+        self.coordinator_stealing = parameters.getboolean(self.SECTION, 'coordinator_stealing', fallback=False)
+        self.__check_lockstep()
+
+    def __check_lockstep(self):
+        # lockstep batches don't record or time runs, curriculum tasks ignore lockstep
+        if not self.lockstep or self.curriculum_tasks:
+            return
+        options = [option for option in ('record_trajectories', 'record_sensors', 'phase_timing', 'trajectory_archive')
+                   if getattr(self, option)]
+        if options:
+            raise RuntimeError('"lockstep" can\'t be combined with: {}'.format(', '.join(options)))
@@ -8,31 +8,35 @@ LIMITS_DIGITS = 3
 LIMIT_LOW = 0.010
 LIMIT_HIGH = 0.060
 
+SAMPLE_BLOCK_SIZE = 1024
 
-def random_dt():
-    return __random_dt()
 
+def sample_dts(rng, size):
+    distribution_ixs = np.searchsorted(DISTRIBUTION_RATIOS, rng.random(size), side='right')
+    means, deviations = np.array(MEANS)[distribution_ixs], np.array(DEVIATIONS)[distribution_ixs]
+    dts = np.empty(size)
+    rejected = np.arange(size)
+    while len(rejected):
+        # rejected samples are drawn again from their distribution
+        dts[rejected] = rng.normal(means[rejected], deviations[rejected])
+        round_dts = np.round(dts[rejected], LIMITS_DIGITS)
+        rejected = rejected[(round_dts < LIMIT_LOW) | (round_dts > LIMIT_HIGH)]
+    return dts, distribution_ixs
 
-def __random_dt(ix=None):
-    ix = __pick_ix(ix)
-    dt = np.random.normal(MEANS[ix], DEVIATIONS[ix], 1)[0]
-    round_dt = np.round(dt, LIMITS_DIGITS)
-    if round_dt < LIMIT_LOW:
-        return __random_dt(ix)
-    if round_dt > LIMIT_HIGH:
-        return __random_dt(ix)
-    return dt
 
+class DtSampler:
+    def __init__(self, seed=None, block_size=SAMPLE_BLOCK_SIZE):
+        self.rng = np.random.default_rng(seed)
+        self.block_size = block_size
+        self.__dts = iter(())
 
-def __pick_ix(ix=None):
-    if ix is None:
-        ix = 0
-        r = np.random.random()
-        for ratio_limit in DISTRIBUTION_RATIOS:
-            if r < ratio_limit:
-                return ix
-            ix += 1
-    return ix
+    def next_dt(self):
+        dt = next(self.__dts, None)
+        if dt is None:
+            dts, _ = sample_dts(self.rng, self.block_size)
+            self.__dts = iter(dts.tolist())
+            dt = next(self.__dts)
+        return dt
 
 
 # Distribution sample printing:
@@ -42,10 +46,8 @@ INIT_COUNTERS = [0] * len(MEANS)
 
 def __print_training_distribution():
     distribution = {}
-    for _ in range(0, SAMPLE_SIZE):
-        # ix = 0
-        ix = __pick_ix()
-        dt = np.round(__random_dt(ix), LIMITS_DIGITS)
+    dts, distribution_ixs = sample_dts(np.random.default_rng(), SAMPLE_SIZE)
+    for dt, ix in zip(np.round(dts, LIMITS_DIGITS).tolist(), distribution_ixs.tolist()):
         times = distribution.setdefault(dt, INIT_COUNTERS.copy())
         times[ix] += 1
         distribution.update(({dt: times}))
@@ -1,4 +1,5 @@
 import math
+import time
 from datetime import datetime
 
 import neat
@@ -10,8 +11,10 @@ BATCH_STATS_TEMPLATE = '_' * 50 + '▏batch fitness: {:8,.0f}'
 
 
 class TrainingReporter(neat.reporting.BaseReporter):
-    def __init__(self, batch_size):
+    def __init__(self, batch_size, phase_timing=None):
         self.batch_size = batch_size
+        self.phase_timing = phase_timing
+        self.generation_start = time.perf_counter()
         self.generations = self.total_fit = self.total_pop = self.batch_fit = 0
         self.max_avg = [-math.inf, 0]
         self.max_fit = [-math.inf, 0]
@@ -20,6 +23,7 @@ class TrainingReporter(neat.reporting.BaseReporter):
 
     def start_generation(self, generation):
         self.generations = generation + 1
+        self.generation_start = time.perf_counter()
 
     def complete_extinction(self):
         self.__report__('--------------------')
@@ -45,6 +49,9 @@ class TrainingReporter(neat.reporting.BaseReporter):
             pop_fit_sum / pop_count,
             best_genome.fitness, best_genome.size()[0], best_genome.size()[1], best_genome.key
         ))
+        if self.phase_timing:
+            print(self.phase_timing.text(time.perf_counter() - self.generation_start))
+            self.phase_timing.reset()
         if (self.generations % self.batch_size) == 0:
             self.__dump_batch_stats__()
             if self.post_batch_hook:
@@ -54,6 +61,16 @@ class TrainingReporter(neat.reporting.BaseReporter):
         print(BATCH_STATS_TEMPLATE.format(self.batch_fit))
         self.batch_fit = 0
 
+    def get_state(self):
+        return {
+            'generations': self.generations, 'total_fit': self.total_fit, 'total_pop': self.total_pop,
+            'batch_fit': self.batch_fit, 'max_avg': self.max_avg, 'max_fit': self.max_fit
+        }
+
+    def set_state(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+
     def run_post_batch(self, post_batch_hook):
         self.post_batch_hook = post_batch_hook
 
@@ -0,0 +1,90 @@
+from multiprocessing.util import Finalize
+
+from game.compiled_level import compile_level
+from game.tracks import Trainings
+from neat_common.genome_codec import GenomeArrays
+from .lockstep_evaluator import LockstepEvaluator
+from .neural_player import NeuralPlayer
+from .phase_timing import PhaseTiming
+from .trajectory import TrajectoryRecorder
+from .trajectory_archive import TrajectoryArchiveWriter
+
+
+class TrainingWorker:
+    def __init__(self, neat_config, training_config):
+        self.neat_config = neat_config
+        self.field_resolution = training_config.field_resolution
+        self.network = training_config.network
+        self.record_trajectories = training_config.record_trajectories
+        self.sensor_count = len(neat_config.genome_config.input_keys) if training_config.record_sensors else 0
+        self.phase_timing = PhaseTiming() if training_config.phase_timing else None
+        self.archive = None
+        if training_config.trajectory_archive:
+            self.archive = TrajectoryArchiveWriter(training_config.trajectory_archive)
+            # pool processes exit without garbage collection, buffered trajectories are written at exit
+            Finalize(self.archive, self.archive.flush, exitpriority=10)
+        self.levels = Trainings().entries()
+        for level, _ in self.levels:
+            compiled_level = compile_level(level)
+            if self.field_resolution:
+                compiled_level.fields(self.field_resolution)
+
+    def evaluate_genome(self, genome, level_ix, seed=None, generation=0):
+        level, limit = self.levels[level_ix]
+        recording = self.record_trajectories or self.archive
+        recorder = TrajectoryRecorder(self.sensor_count) if recording else None
+        fitness = NeuralPlayer.evaluate_genome(genome, self.neat_config, level, limit,
+                                               self.field_resolution, self.network, seed, recorder, self.phase_timing)
+        if not recorder:
+            return fitness
+
+        trajectory = recorder.trajectory(genome.key, level.name, fitness)
+        if self.archive:
+            self.archive.append(generation, trajectory)
+        return (fitness, trajectory) if self.record_trajectories else fitness
+
+    def evaluate_lockstep(self, genomes, level_ix, seeds=None):
+        level, limit = self.levels[level_ix]
+        return LockstepEvaluator.evaluate_genomes(genomes, self.neat_config, level, limit,
+                                                  self.field_resolution, seeds)
+
+    def evaluate_curriculum(self, genome, start=0, seeds=None, generation=0):
+        level_results = []
+        seeds = seeds if seeds else [None] * (len(self.levels) - start)
+        for level_ix, seed in zip(range(start, len(self.levels)), seeds):
+            level_result = self.evaluate_genome(genome, level_ix, seed, generation)
+            level_results.append(level_result)
+            fitness = level_result[0] if self.record_trajectories else level_result
+            if fitness < self.levels[level_ix][1]:
+                break
+        return level_results
+
+    def with_phase_timing(self, result):
+        if not self.phase_timing:
+            return result
+        # the timing of a task is sent along with its result
+        phase_timing, self.phase_timing = self.phase_timing, PhaseTiming()
+        return result, phase_timing
+
+
+__worker = None
+
+
+def init_worker(neat_config, training_config):
+    global __worker
+    __worker = TrainingWorker(neat_config, training_config)
+
+
+def evaluate_genome(genome_data, level_ix, seed=None, generation=0):
+    return __worker.with_phase_timing(
+        __worker.evaluate_genome(GenomeArrays.decode(genome_data), level_ix, seed, generation))
+
+
+def evaluate_lockstep(genome_data, level_ix, seeds=None):
+    genomes = [GenomeArrays.decode(data) for data in genome_data]
+    return __worker.evaluate_lockstep(genomes, level_ix, seeds)
+
+
+def evaluate_curriculum(genome_data, start=0, seeds=None, generation=0):
+    return __worker.with_phase_timing(
+        __worker.evaluate_curriculum(GenomeArrays.decode(genome_data), start, seeds, generation))
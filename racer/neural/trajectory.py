@@ -0,0 +1,76 @@
+import math
+
+import numpy as np
+
+from game.racer_engine import CAR_COLL_BOX, PlayerState, create_collision_box
+
+T_COL, X_COL, Y_COL, ROTATION_COL, ALIVE_COL, SCORE_COL = range(6)
+STATE_COLUMNS = 6
+INITIAL_CAPACITY = 256
+
+
+class TrajectoryRecorder:
+    def __init__(self, sensor_count=0):
+        self.sensor_count = sensor_count
+        self.__data = np.full((INITIAL_CAPACITY, STATE_COLUMNS + sensor_count), np.nan, dtype=np.float32)
+        self.__length = 0
+
+    def record(self, t, state, score, sensors=None):
+        if self.__length == len(self.__data):
+            grown = np.full((2 * len(self.__data), self.__data.shape[1]), np.nan, dtype=np.float32)
+            grown[:self.__length] = self.__data
+            self.__data = grown
+        row = self.__data[self.__length]
+        row[:STATE_COLUMNS] = t, state.x, state.y, state.rotation, state.is_alive, score
+        # sensor readings the network input of this step was computed from
+        if self.sensor_count and sensors is not None:
+            row[STATE_COLUMNS:] = sensors
+        self.__length += 1
+
+    def trajectory(self, genome_key, level_name, fitness):
+        return Trajectory(genome_key, level_name, fitness, self.__data[:self.__length].copy())
+
+
+class Trajectory:
+    def __init__(self, genome_key, level_name, fitness, data):
+        self.genome_key = genome_key
+        self.level_name = level_name
+        self.fitness = fitness
+        self.data = data
+
+    @property
+    def sensor_count(self):
+        return self.data.shape[1] - STATE_COLUMNS
+
+    @property
+    def duration(self):
+        return float(self.data[-1, T_COL])
+
+    @property
+    def sensors(self):
+        return self.data[:, STATE_COLUMNS:]
+
+    def frame_ix(self, time):
+        ix = np.searchsorted(self.data[:, T_COL], time, side='right') - 1
+        return min(max(ix, 0), len(self.data) - 1)
+
+    def score_at(self, ix):
+        return float(self.data[ix, SCORE_COL])
+
+    def state_at(self, ix):
+        t, x, y, rotation, alive, score = self.data[ix, :STATE_COLUMNS].tolist()
+        return TrajectoryState(x, y, rotation, bool(alive), score * 10)
+
+
+class TrajectoryState:
+    __slots__ = ('x', 'y', 'rotation', 'is_alive', 'distance')
+    last_deltas = PlayerState.EMPTY_DELTAS
+
+    def __init__(self, x, y, rotation, is_alive, distance):
+        self.x, self.y, self.rotation = x, y, rotation
+        self.is_alive = is_alive
+        self.distance = distance
+
+    def flattened_boundaries(self):
+        rot = math.radians(self.rotation)
+        return create_collision_box(CAR_COLL_BOX, self.x, self.y, math.cos(rot), math.sin(rot)).flatten()
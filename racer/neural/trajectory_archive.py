@@ -0,0 +1,100 @@
+import glob
+import os
+import socket
+import time
+
+import numpy as np
+
+from .trajectory import Trajectory
+
+SEGMENT_ROWS = 1 << 16
+FLUSH_SECONDS = 5
+SEGMENT_SUFFIX = '.npy'
+INDEX_SUFFIX = '.idx.npy'
+INDEX_DTYPE = np.dtype([('generation', '<i4'), ('genome_key', '<i8'), ('level_name', '<U32'),
+                        ('fitness', '<f8'), ('start', '<i8'), ('length', '<i8')])
+
+
+class TrajectoryArchiveWriter:
+    """ buffers the runs of one process, a segment is written when the buffered rows
+        exceed segment_rows or the oldest buffered run is older than FLUSH_SECONDS """
+
+    def __init__(self, directory, segment_rows=SEGMENT_ROWS):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.segment_rows = segment_rows
+        self.writer_id = '{}-{}-{}'.format(socket.gethostname(), os.getpid(), int(time.time()))
+        self.segment_count = 0
+        self.__trajectories = []
+        self.__entries = []
+        self.__rows = 0
+        self.__flush_time = None
+
+    def append(self, generation, trajectory: Trajectory):
+        if not self.__entries:
+            self.__flush_time = time.monotonic() + FLUSH_SECONDS
+        self.__entries.append((generation, trajectory.genome_key, trajectory.level_name, trajectory.fitness,
+                               self.__rows, len(trajectory.data)))
+        self.__trajectories.append(trajectory.data)
+        self.__rows += len(trajectory.data)
+        if self.__rows >= self.segment_rows or time.monotonic() > self.__flush_time:
+            self.flush()
+
+    def flush(self):
+        if not self.__entries:
+            return
+        segment_name = os.path.join(self.directory, '{}_{:06d}'.format(self.writer_id, self.segment_count))
+        # stored column-wise, one trajectory is a column slice of the segment
+        columns = np.ascontiguousarray(np.concatenate(self.__trajectories).T)
+        self.__write(segment_name + SEGMENT_SUFFIX, columns)
+        # the index is written last, segments without index are ignored by readers
+        self.__write(segment_name + INDEX_SUFFIX, np.array(self.__entries, dtype=INDEX_DTYPE))
+        self.segment_count += 1
+        self.__trajectories, self.__entries, self.__rows = [], [], 0
+
+    @staticmethod
+    def __write(file_name, array):
+        temp_file = file_name + '.tmp'
+        with open(temp_file, 'wb') as f:
+            np.save(f, array)
+        os.replace(temp_file, file_name)
+
+
+class TrajectoryArchive:
+    def __init__(self, directory):
+        self.directory = directory
+        self.segment_files = []
+        self.index = np.empty(0, dtype=INDEX_DTYPE)
+        self.segments = np.empty(0, dtype=int)
+        self.__columns = {}
+        self.refresh()
+
+    def refresh(self):
+        index_files = sorted(glob.glob(os.path.join(self.directory, '*' + INDEX_SUFFIX)))
+        self.segment_files = [index_file[:-len(INDEX_SUFFIX)] + SEGMENT_SUFFIX for index_file in index_files]
+        indices = [np.load(index_file) for index_file in index_files]
+        self.index = np.concatenate(indices) if indices else np.empty(0, dtype=INDEX_DTYPE)
+        self.segments = np.repeat(np.arange(len(indices)), [len(index) for index in indices])
+
+    def find(self, generation=None, genome_key=None, level_name=None):
+        selected = np.ones(len(self.index), dtype=bool)
+        if generation is not None:
+            selected &= self.index['generation'] == generation
+        if genome_key is not None:
+            selected &= self.index['genome_key'] == genome_key
+        if level_name is not None:
+            selected &= self.index['level_name'] == level_name
+        return np.flatnonzero(selected)
+
+    def select(self, generation=None, genome_key=None, level_name=None):
+        return [self.trajectory(ix) for ix in self.find(generation, genome_key, level_name)]
+
+    def trajectory(self, ix):
+        entry, columns = self.index[ix], self.__segment_columns(self.segments[ix])
+        data = columns[:, entry['start']:entry['start'] + entry['length']].T
+        return Trajectory(int(entry['genome_key']), str(entry['level_name']), float(entry['fitness']), data)
+
+    def __segment_columns(self, segment):
+        if segment not in self.__columns:
+            self.__columns[segment] = np.load(self.segment_files[segment], mmap_mode='r')
+        return self.__columns[segment]
@@ -1,7 +1,8 @@
+import queue
 import random
 import traceback
-from multiprocessing import Pool
-from signal import signal, SIGINT
+from multiprocessing import Pool, Process, Queue
+from signal import signal, SIGINT, SIG_IGN
 from typing import List
 
 import neat
@@ -10,29 +11,55 @@ from game.racer_engine import PlayerState
 from game.racer_window import RaceController, RacerWindow
 from game.tracks import Level, Trainings, SHOWCASE_FROM_FILE_LEVEL
 from neural.best_player_keep import BestPlayerKeep, PlayerData, load_player_data
-from neural.neural_player import NeuralPlayer
+from neural.distributed_pool import DistributedPool
+from neural.neural_player import NeuralPlayer, NEAT_NETWORK
+from neural.phase_timing import PhaseTiming
+from neural.population_evaluator import PopulationEvaluator
+from neural.training_checkpoint import TrainingCheckpoint, load_checkpoint
 from neural.training_configs import load_configs
 from neural.training_dts import LIMIT_HIGH
 from neural.training_reporter import TrainingReporter
+from neural.trajectory import Trajectory
+from neural.training_worker import init_worker
 
 DT_IGNORE_LIMIT = LIMIT_HIGH
-LEVEL_COUNT_FMT = '[{:>9}]: {:2}'
+CLOSE_REQUEST = 'close'
+SHOWCASE_CLOSE_TIMEOUT = 120
 
 
 class NeuralMaster:
     def __init__(self):
         self.neat_config, self.training_config = load_configs()
-        self.reporter = TrainingReporter(self.training_config.showcase_batch_size)
+        self.phase_timing = PhaseTiming() if self.training_config.phase_timing else None
+        self.reporter = TrainingReporter(self.training_config.showcase_batch_size, self.phase_timing)
         self.best_keep = BestPlayerKeep(self.training_config)
-        self.trainings = Trainings()
 
+        self.population = None
+        self.checkpoint = None
+        self.viewer = None
         self.pool = None
         signal(SIGINT, self.stop)
-        self.pool = Pool(processes=self.training_config.processes)
+        initargs = self.neat_config, self.training_config
+        if self.training_config.coordinator_address:
+            self.pool = DistributedPool(self.training_config.coordinator_address,
+                                        self.training_config.coordinator_authkey, init_worker, initargs,
+                                        self.training_config.coordinator_stealing)
+        else:
+            self.pool = Pool(processes=self.training_config.processes, initializer=init_worker, initargs=initargs)
+        self.evaluator = PopulationEvaluator(self.neat_config, self.training_config, self.pool, self.phase_timing)
 
-    def train(self):
-        population = neat.Population(self.neat_config)
+    def train(self, resume_file=None):
+        if resume_file:
+            population = load_checkpoint(resume_file, self.neat_config, self.reporter, self.best_keep)
+        else:
+            population = neat.Population(self.neat_config)
         population.add_reporter(self.reporter)
+        self.population = population
+        self.checkpoint = TrainingCheckpoint(self.training_config.checkpoint_every_gen, population,
+                                             self.reporter, self.best_keep)
+        population.add_reporter(self.checkpoint)
+        self.evaluator.scheduler.ancestors = population.reproduction.ancestors
+        self.viewer = ShowcaseViewer(self.training_config)
         try:
             population.run(self.eval_population)
         except Exception as ex:
@@ -42,6 +69,14 @@ class NeuralMaster:
             self.stop()
 
     def stop(self, signal_received=None, frame=None):
+        if self.checkpoint:
+            self.checkpoint.flush()
+            print('checkpoint stored: <{}>'.format(self.checkpoint.file_name))
+            self.checkpoint = None
+        if self.viewer:
+            # interrupted trainings don't wait for the playing showcase
+            self.viewer.close(wait=signal_received is None)
+            self.viewer = None
         if self.pool:
             self.pool.close()
             self.pool.join()
@@ -51,43 +86,24 @@ class NeuralMaster:
 
     def eval_population(self, key_genome_tuples, config: neat.config.Config):
         genomes = list(zip(*key_genome_tuples))[1]
-        for genome in genomes:
-            genome.fitness = 0
-
-        remaining_genomes = list(genomes)
-        level_ix = 0
-        passing_counts = ['Levels passed:']
-        self.trainings.reset()
-        while len(remaining_genomes) and self.trainings.has_next():
-            level, limit = self.trainings.next()
-            remaining_genomes = self.evaluate_genomes_passing(remaining_genomes, config, level, limit)
-            passing_counts.append(LEVEL_COUNT_FMT.format(level.name, len(remaining_genomes)))
-            level_ix += 1
-
-        print(' '.join(passing_counts))
+        # archived runs carry neat's 0-based generation, like the checkpoints
+        level_ix = self.evaluator.evaluate(genomes, self.population.generation)
         self.best_keep.add_population_result([(genome, config) for genome in genomes])
         self.reporter.run_post_batch(self.showcase_best(genomes, config, level_ix))
 
-    def evaluate_genomes_passing(self, genomes, config, level, limit):
-        passing_genomes = []
-        eval_params = [(genome, config, level, limit) for genome in genomes]
-        eval_result = self.pool.starmap(NeuralPlayer.evaluate_genome, eval_params)
-
-        for fitness, genome in zip(eval_result, genomes):
-            genome.fitness += fitness
-            if fitness >= limit:
-                passing_genomes.append(genome)
-        return passing_genomes
-
     def showcase_best(self, genomes, config, level_limit):
+        trajectories = self.evaluator.trajectories
+        generation = self.reporter.generations
+
         def showcase():
             sorted_genomes = sorted(genomes, key=lambda gen: gen.fitness, reverse=True)
-            top_players = [PlayerData(genome, config)
-                           for genome in sorted_genomes[:self.training_config.showcase_racer_count]]
-            self.trainings.reset()
-            for level_ix in range(level_limit):
-                level, limit = self.trainings.next()
-                self.showcase(top_players, level, limit=limit)
+            top_genomes = sorted_genomes[:self.training_config.showcase_racer_count]
+            top_players = [PlayerData(genome, config) for genome in top_genomes]
+            level_showcases = []
+            for level_ix, (level, _) in enumerate(self.evaluator.trainings.entries()[:level_limit]):
+                recorded = [trajectories.get((genome.key, level.name)) for genome in top_genomes]
+                level_showcases.append((level_ix, recorded if all(recorded) else None))
+            self.viewer.show(generation, top_players, level_showcases)
 
         return showcase
 
@@ -101,44 +117,143 @@ class NeuralMaster:
         self.showcase(players, SHOWCASE_FROM_FILE_LEVEL, auto_close=False)
 
     def showcase(self, players: List[PlayerData], level, limit=None, auto_close=True):
-        fitness_log = ['#{} ({:.0f})'.format(data.genome.key, data.fitness) for data in players]
-        print('Showcase: {} players, key (fitness): {}'.format(len(players), ', '.join(fitness_log)))
-        try:
-            ShowcaseController(players, self.pool, level, limit, auto_close).showcase()
-        except Exception as e:
-            if str(e) == 'list index out of range':
-                print('Showcase error: no screen available')
+        show_players(players, level, self.training_config, limit, auto_close)
+
+
+def show_players(players: List[PlayerData], level, training_config, limit=None, auto_close=True):
+    fitness_log = ['#{} ({:.0f})'.format(data.genome.key, data.fitness) for data in players]
+    print('Showcase: {} players, key (fitness): {}'.format(len(players), ', '.join(fitness_log)))
+    run_showcase(lambda: LiveShowcaseController(players, level, limit, auto_close,
+                                                training_config.network, training_config.field_resolution))
+
+
+def replay_trajectories(trajectories: List[Trajectory], level, auto_close=True):
+    fitness_log = ['#{} ({:.0f})'.format(trajectory.genome_key, trajectory.fitness) for trajectory in trajectories]
+    print('Replay: {} players, key (fitness): {}'.format(len(trajectories), ', '.join(fitness_log)))
+    run_showcase(lambda: ReplayShowcaseController(trajectories, level, auto_close))
+
+
+def run_showcase(create_controller):
+    try:
+        create_controller().showcase()
+    except Exception as e:
+        if str(e) == 'list index out of range':
+            print('Showcase error: no screen available')
+        else:
+            print('Showcase error:', e)
+            traceback.print_tb(e.__traceback__)
+
+
+class ShowcaseViewer:
+    """ plays showcases in a separate process, the training continues meanwhile """
+
+    def __init__(self, training_config):
+        self.requests = Queue()
+        self.process = Process(target=run_showcase_viewer, args=(self.requests, training_config), daemon=True)
+        self.process.start()
+
+    def show(self, generation, players: List[PlayerData], level_showcases):
+        self.requests.put((generation, players, level_showcases))
+
+    def close(self, wait=True):
+        if wait and self.process.is_alive():
+            # the playing showcase and the last requested one are shown before the viewer exits
+            self.requests.put(CLOSE_REQUEST)
+            self.process.join(SHOWCASE_CLOSE_TIMEOUT)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+            # requests the viewer didn't read are dropped
+            self.requests.cancel_join_thread()
+
+
+def run_showcase_viewer(requests, training_config):
+    # stopped by the training process
+    signal(SIGINT, SIG_IGN)
+    levels = Trainings().entries()
+    showcase_requests = ShowcaseRequests(requests)
+    request = showcase_requests.latest()
+    while request is not None:
+        generation, players, level_showcases = request
+        print('Showcase generation: {}'.format(generation))
+        for level_ix, trajectories in level_showcases:
+            if showcase_requests.has_newer():
+                break
+            level, limit = levels[level_ix]
+            if trajectories:
+                replay_trajectories(trajectories, level)
             else:
-                print('Showcase error:', e)
-                traceback.print_tb(e.__traceback__)
+                show_players(players, level, training_config, limit=limit)
+        request = showcase_requests.latest()
+
+
+class ShowcaseRequests:
+    """ the viewer is behind the training: stale showcases are skipped, the most recent one is shown """
+
+    def __init__(self, requests):
+        self.requests = requests
+        self.closing = False
+        self.__newest = None
+
+    def has_newer(self):
+        # a close request doesn't interrupt the playing showcase
+        self.__read_available()
+        return self.__newest is not None
+
+    def latest(self):
+        # None once closing and every request is shown
+        if self.__newest is None and not self.closing:
+            self.__add(self.requests.get())
+        self.__read_available()
+        request, self.__newest = self.__newest, None
+        return request
+
+    def __read_available(self):
+        while True:
+            try:
+                self.__add(self.requests.get_nowait())
+            except queue.Empty:
+                return
+
+    def __add(self, request):
+        if request == CLOSE_REQUEST:
+            self.closing = True
+            return
+        if self.__newest is not None:
+            print('Showcase skipped: generation {}'.format(self.__newest[0]))
+        self.__newest = request
 
 
 class ShowcaseController(RaceController):
     DELAY_AUTO_CLOSE_SECS = 3
 
-    def __init__(self, players: List[PlayerData], pool: Pool, level: Level, limit: int, auto_close: bool):
+    def __init__(self, level: Level, auto_close: bool):
         super().__init__(level)
-        self.__neural_player = [NeuralPlayer(data.genome, data.config, level, limit, name=data.name)
-                                for data in players]
-        self.__pool = pool
-        self.window = RacerWindow(self, show_fps=True)
         self.auto_close = auto_close
         self.seconds_to_close = self.DELAY_AUTO_CLOSE_SECS
         self.closing = False
+        self.window = None
 
     def showcase(self):
+        self.window = RacerWindow(self, show_fps=True)
         self.window.start()
 
+    def get_player_scores(self):
+        raise NotImplementedError()
+
+    def step_players(self, dt):
+        raise NotImplementedError()
+
     def get_score_text(self):
-        highest_score = max([player.score for player in self.__neural_player])
+        highest_score = max(score for _, score in self.get_player_scores())
         return 'max: {:.0f}'.format(highest_score)
 
     def get_ranking(self):
-        ranking = sorted(enumerate(self.__neural_player), key=lambda pl: pl[1].score, reverse=True)
+        ranking = sorted(enumerate(self.get_player_scores()), key=lambda pl: pl[1][1], reverse=True)
         names, scores = '#  name\n────────────\n', 'score\n\n'
-        for ix, player in ranking:
-            names += '{}  {}\n'.format(ix + 1, player.name)
-            scores += '{:.0f}\n'.format(player.score)
+        for ix, (name, score) in ranking:
+            names += '{}  {}\n'.format(ix + 1, name)
+            scores += '{:.0f}\n'.format(score)
         return names, scores
 
     def update_player_states(self, dt):
@@ -151,9 +266,32 @@ class ShowcaseController(RaceController):
                 self.window.close()
                 self.closing = True
         else:
-            pool_params = [(player, dt) for player in self.__neural_player]
-            self.__neural_player = self.__pool.starmap(update_player_state, pool_params)
-            self.show_end_screen = all([player.engine.game_over for player in self.__neural_player])
+            self.show_end_screen = self.step_players(dt)
+
+    def get_end_text(self):
+        if self.auto_close:
+            return '', 'waiting {} seconds to exit...'.format(self.DELAY_AUTO_CLOSE_SECS), ''
+        else:
+            return '', ''
+
+
+class LiveShowcaseController(ShowcaseController):
+    def __init__(self, players: List[PlayerData], level: Level, limit: int, auto_close: bool,
+                 network=NEAT_NETWORK, field_resolution=0):
+        super().__init__(level, auto_close)
+        self.__neural_player = [NeuralPlayer(data.genome, data.config, level, limit, name=data.name,
+                                             field_resolution=field_resolution, network=network)
+                                for data in players]
+
+    def get_player_scores(self):
+        return [(player.name, player.score) for player in self.__neural_player]
+
+    def step_players(self, dt):
+        # players are stepped in-process, a step takes well under a millisecond
+        for player in self.__neural_player:
+            if not player.engine.game_over:
+                player.next_step(dt)
+        return all([player.engine.game_over for player in self.__neural_player])
 
     def get_player_states(self) -> List[PlayerState]:
         return [player.get_state() for player in self.__neural_player]
@@ -161,14 +299,26 @@ class ShowcaseController(RaceController):
     def get_player_count(self):
         return len(self.__neural_player)
 
-    def get_end_text(self):
-        if self.auto_close:
-            return '', 'waiting {} seconds to exit...'.format(self.DELAY_AUTO_CLOSE_SECS), ''
-        else:
-            return '', ''
 
+class ReplayShowcaseController(ShowcaseController):
+    def __init__(self, trajectories: List[Trajectory], level: Level, auto_close: bool):
+        super().__init__(level, auto_close)
+        self.__trajectories = trajectories
+        self.__frames = [0] * len(trajectories)
+        self.time = 0
+
+    def get_player_scores(self):
+        return [('{}'.format(trajectory.genome_key), trajectory.score_at(frame))
+                for trajectory, frame in zip(self.__trajectories, self.__frames)]
 
-def update_player_state(player, dt):
-    if not player.engine.game_over:
-        player.next_step(dt)
-    return player
+    def step_players(self, dt):
+        # recorded frames are shown at their recorded times, nothing is simulated
+        self.time += dt
+        self.__frames = [trajectory.frame_ix(self.time) for trajectory in self.__trajectories]
+        return all(self.time >= trajectory.duration for trajectory in self.__trajectories)
+
+    def get_player_states(self):
+        return [trajectory.state_at(frame) for trajectory, frame in zip(self.__trajectories, self.__frames)]
+
+    def get_player_count(self):
+        return len(self.__trajectories)
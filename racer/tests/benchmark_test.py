@@ -0,0 +1,31 @@
+import unittest
+from unittest import mock
+
+import benchmark
+from benchmark import RacerBenchmark
+from neural.training_configs import load_configs
+
+BENCH_LEVELS = 1
+BENCH_GENOMES = 3
+BENCH_POSES = 20
+BENCH_STEPS = 20
+
+
+def recording_configs():
+    neat_config, training_config = load_configs()
+    training_config.record_trajectories = training_config.record_sensors = True
+    training_config.phase_timing = True
+    return neat_config, training_config
+
+
+class RacerBenchmarkTestCase(unittest.TestCase):
+    @mock.patch.object(benchmark, 'STEP_COUNT', BENCH_STEPS)
+    @mock.patch.object(benchmark, 'POSE_COUNT', BENCH_POSES)
+    @mock.patch.object(benchmark, 'load_configs', recording_configs)
+    def test_population_rate_with_recording_and_phase_timing(self):
+        bench = RacerBenchmark()
+        bench.levels = bench.levels[:BENCH_LEVELS]
+        bench.genomes = bench.genomes[:BENCH_GENOMES]
+        results = bench.run(process_counts=[1])
+        self.assertGreater(results['eval_population[1 processes]']['value'], 0)
+        self.assertTrue(bench.training_config.record_trajectories and bench.training_config.phase_timing)
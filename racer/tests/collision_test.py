@@ -0,0 +1,51 @@
+import unittest
+
+import numpy as np
+
+from game.collision import SegmentCollision, ShapelyCollision
+from game.geometry import create_collision_boxes
+from game.racer_engine import CAR_COLL_BOX
+from game.tracks import MANUAL_LEVELS
+
+SAMPLES = 4000
+EDGE_SAMPLES = 2000
+EDGE_JITTER = 15
+
+
+def random_cars(rng, level):
+    x = rng.uniform(0, level.width, SAMPLES)
+    y = rng.uniform(0, level.height, SAMPLES)
+    # cars close to the track borders and obstacles cross edges most often
+    border = np.concatenate((np.reshape(level.outer_track, (-1, 2)), np.reshape(level.inner_track, (-1, 2)),
+                             np.reshape([(obstacle.x, obstacle.y) for obstacle in level.obstacles], (-1, 2))))
+    near = border[rng.integers(0, len(border), EDGE_SAMPLES)] + rng.uniform(-EDGE_JITTER, EDGE_JITTER,
+                                                                            (EDGE_SAMPLES, 2))
+    x, y = np.concatenate((x, near[:, 0])), np.concatenate((y, near[:, 1]))
+    rot = rng.uniform(0, 2 * np.pi, len(x))
+    return create_collision_boxes(CAR_COLL_BOX, x, y, np.cos(rot), np.sin(rot))
+
+
+class CollisionTestCase(unittest.TestCase):
+    def test_segments_match_shapely_on_all_levels(self):
+        rng = np.random.default_rng(0)
+        for level in MANUAL_LEVELS:
+            cars = random_cars(rng, level)
+            expected = ShapelyCollision(level).contains_all(cars)
+            actual = SegmentCollision(level).contains_all(cars)
+            self.assertTrue(np.any(expected) and not np.all(expected), level.name)
+            np.testing.assert_array_equal(actual, expected, err_msg=level.name)
+
+    def test_single_car_matches_batch_on_all_levels(self):
+        rng = np.random.default_rng(1)
+        for level in MANUAL_LEVELS:
+            cars = random_cars(rng, level)
+            collision = SegmentCollision(level)
+            single = np.array([collision.contains(car) for car in cars])
+            np.testing.assert_array_equal(single, collision.contains_all(cars), err_msg=level.name)
+
+    def test_single_car_outside_of_level(self):
+        level = MANUAL_LEVELS[0]
+        car = create_collision_boxes(CAR_COLL_BOX, np.array([-500.0]), np.array([-500.0]),
+                                     np.array([1.0]), np.array([0.0]))[0]
+        self.assertFalse(SegmentCollision(level).contains(car))
+        self.assertFalse(ShapelyCollision(level).contains(car))
@@ -0,0 +1,28 @@
+import copy
+import unittest
+
+from game.compiled_level import COMPILED_LEVELS_CACHE_SIZE, compile_level
+from game.tracks import MANUAL_LEVELS
+
+
+def renamed_level(name):
+    level = copy.copy(MANUAL_LEVELS[0])
+    level.name = name
+    return level
+
+
+class CompiledLevelTestCase(unittest.TestCase):
+    def test_same_geometry_is_compiled_once(self):
+        level = MANUAL_LEVELS[0]
+        self.assertIs(compile_level(level), compile_level(copy.deepcopy(level)))
+
+    def test_least_recently_used_level_is_evicted(self):
+        first, second = renamed_level('lru first'), renamed_level('lru second')
+        compiled_first, compiled_second = compile_level(first), compile_level(second)
+        for ix in range(COMPILED_LEVELS_CACHE_SIZE - 2):
+            compile_level(renamed_level('lru {}'.format(ix)))
+        self.assertIs(compile_level(first), compiled_first)
+
+        compile_level(renamed_level('lru evicting'))
+        self.assertIs(compile_level(first), compiled_first)
+        self.assertIsNot(compile_level(second), compiled_second)
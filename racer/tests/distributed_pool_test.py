@@ -0,0 +1,144 @@
+import os
+import time
+import unittest
+import threading
+from multiprocessing import Process
+from multiprocessing.connection import Client
+from unittest import mock
+
+from neural import distributed_pool
+from neural.distributed_pool import DistributedPool, HELLO_MSG, check_authkey, parse_address, run_worker
+
+ADDRESS = 'localhost:0'
+AUTHKEY = '0123456789abcdef'
+
+
+class AuthkeyTestCase(unittest.TestCase):
+    def test_rejects_missing_placeholder_and_short_keys(self):
+        for authkey in ('', 'racer', 'Racer', 'changeme', 'short-key'):
+            with self.assertRaises(RuntimeError, msg=authkey):
+                check_authkey(authkey)
+
+    def test_accepts_secret(self):
+        self.assertEqual(check_authkey(AUTHKEY), AUTHKEY.encode())
+
+    def test_coordinator_and_worker_refuse_to_start(self):
+        with self.assertRaises(RuntimeError):
+            DistributedPool(ADDRESS, 'racer')
+        with self.assertRaises(RuntimeError):
+            run_worker(ADDRESS, '')
+
+
+SLOW_TASK_SECONDS = 3
+FAST_TASK_SECONDS = 0.1
+JOIN_TIMEOUT = 10
+KILL_DELAY = 0.5
+TEST_HEARTBEAT_INTERVAL = 0.2
+TEST_HEARTBEAT_TIMEOUT = 1
+
+
+def worker_task(task_ix):
+    slow = os.environ['TEST_WORKER'] == 'slow' and task_ix == 0
+    time.sleep(SLOW_TASK_SECONDS if slow else FAST_TASK_SECONDS)
+    return os.environ['TEST_WORKER']
+
+
+def start_worker(address, name):
+    def run_named_worker():
+        os.environ['TEST_WORKER'] = name
+        run_worker(address, AUTHKEY, 1)
+
+    process = Process(target=run_named_worker)
+    process.start()
+    return process
+
+
+def wait_for_workers(pool, worker_count):
+    deadline = time.monotonic() + JOIN_TIMEOUT
+    while pool.worker_count != worker_count and time.monotonic() < deadline:
+        time.sleep(FAST_TASK_SECONDS)
+    return pool.worker_count
+
+
+def connect_silent_worker(address):
+    # joins like a worker, but never sends heartbeats or results
+    connection = Client(parse_address(address), authkey=AUTHKEY.encode())
+    connection.recv()
+    connection.send((HELLO_MSG, 'silent', 1))
+    return connection
+
+
+class DistributedPoolTestCase(unittest.TestCase):
+    def start_pool(self, steal_tasks):
+        pool = DistributedPool(ADDRESS, AUTHKEY, steal_tasks=steal_tasks)
+        workers = []
+        # the slow worker joins first, so it is the first one offered new tasks
+        for name in ('slow', 'fast'):
+            workers.append(start_worker(pool.address, name))
+            self.assertEqual(wait_for_workers(pool, len(workers)), len(workers))
+        return pool, workers
+
+    @staticmethod
+    def stop_pool(pool, workers):
+        pool.close()
+        for worker in workers:
+            worker.join(JOIN_TIMEOUT)
+            if worker.is_alive():
+                worker.terminate()
+
+    def test_tasks_run_once_without_stealing(self):
+        pool, workers = self.start_pool(steal_tasks=False)
+        try:
+            start = time.monotonic()
+            self.assertEqual(pool.starmap(worker_task, [(0,), (1,)]), ['slow', 'fast'])
+            self.assertGreaterEqual(time.monotonic() - start, SLOW_TASK_SECONDS)
+        finally:
+            self.stop_pool(pool, workers)
+
+    def test_stolen_task_keeps_slot_of_slow_worker_busy(self):
+        pool, workers = self.start_pool(steal_tasks=True)
+        try:
+            start = time.monotonic()
+            self.assertEqual(pool.starmap(worker_task, [(0,), (1,)]), ['fast', 'fast'])
+            self.assertLess(time.monotonic() - start, SLOW_TASK_SECONDS)
+            # the slow worker still runs its copy of task 0, new tasks go to the fast worker
+            self.assertEqual(pool.starmap(worker_task, [(2,)]), ['fast'])
+        finally:
+            self.stop_pool(pool, workers)
+
+    def test_tasks_of_killed_worker_finish_on_other_worker(self):
+        pool, workers = self.start_pool(steal_tasks=False)
+        try:
+            threading.Timer(KILL_DELAY, workers[0].terminate).start()
+            self.assertEqual(pool.starmap(worker_task, [(0,), (1,)]), ['fast', 'fast'])
+            self.assertEqual(pool.worker_count, 1)
+        finally:
+            self.stop_pool(pool, workers)
+
+    @mock.patch.object(distributed_pool, 'HEARTBEAT_TIMEOUT', TEST_HEARTBEAT_TIMEOUT)
+    @mock.patch.object(distributed_pool, 'HEARTBEAT_INTERVAL', TEST_HEARTBEAT_INTERVAL)
+    def test_silent_worker_is_removed_and_its_tasks_requeued(self):
+        pool = DistributedPool(ADDRESS, AUTHKEY)
+        silent = connect_silent_worker(pool.address)
+        self.assertEqual(wait_for_workers(pool, 1), 1)
+        workers = [start_worker(pool.address, 'fast')]
+        try:
+            self.assertEqual(wait_for_workers(pool, 2), 2)
+            # the silent worker joined first and got task 0
+            self.assertEqual(pool.starmap(worker_task, [(0,), (1,)]), ['fast', 'fast'])
+            self.assertEqual(pool.worker_count, 1)
+            # the coordinator shut the connection down after sending task 0
+            with self.assertRaises(EOFError):
+                while silent.poll(JOIN_TIMEOUT):
+                    silent.recv()
+        finally:
+            silent.close()
+            self.stop_pool(pool, workers)
+
+    def test_join_returns_when_closed_pool_has_no_workers(self):
+        pool = DistributedPool(ADDRESS, AUTHKEY)
+        threading.Thread(target=pool.starmap, args=(worker_task, [(0,)]), daemon=True).start()
+        pool.close()
+        start = time.monotonic()
+        pool.join()
+        self.assertLess(time.monotonic() - start, FAST_TASK_SECONDS * 10)
@@ -0,0 +1,74 @@
+import copy
+import unittest
+
+from benchmark import load_example_genomes
+from game.tracks import Trainings
+from neural.fitness_cache import FitnessCache, genome_hash
+from neural.neural_player import NeuralPlayer, SOURCE_NETWORK
+from tests.genomes import load_tracer_config, random_genomes
+
+EVAL_SEED = 7
+EXAMPLE_COUNT = 3
+LEVEL_COUNT = 2
+
+
+class FitnessCacheTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.config = load_tracer_config()
+        examples = load_example_genomes(cls.config.genome_config)
+        cls.genomes = sorted(examples, key=lambda genome: genome.fitness, reverse=True)[:EXAMPLE_COUNT]
+        cls.levels = Trainings().entries()[:LEVEL_COUNT]
+
+    def evaluate(self, genome, level, limit, seed):
+        return NeuralPlayer.evaluate_genome(genome, self.config, level, limit, network=SOURCE_NETWORK, seed=seed)
+
+    def test_seeded_evaluation_is_repeatable(self):
+        cache = FitnessCache(EVAL_SEED)
+        for level, limit in self.levels:
+            for genome in self.genomes:
+                seed = cache.seed(cache.key(genome, level))
+                first = self.evaluate(genome, level, limit, seed)
+                self.assertEqual(self.evaluate(copy.deepcopy(genome), level, limit, seed), first, level.name)
+
+    def test_cached_fitness_equals_evaluation(self):
+        cache = FitnessCache(EVAL_SEED)
+        level, limit = self.levels[0]
+
+        def evaluate_seeded(genomes, seeds):
+            return [self.evaluate(genome, level, limit, seed) for genome, seed in zip(genomes, seeds)]
+
+        evaluated = cache.evaluate(self.genomes, level, evaluate_seeded)
+        self.assertEqual(cache.evaluate([copy.deepcopy(genome) for genome in self.genomes], level, evaluate_seeded),
+                         evaluated)
+        self.assertEqual((cache.hits, cache.misses), (len(self.genomes), len(self.genomes)))
+
+
+class GenomeHashTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.genome = random_genomes(load_tracer_config(), 1, seed=3)[0]
+
+    def test_toggling_a_connection_changes_the_hash(self):
+        genome = copy.deepcopy(self.genome)
+        original = genome_hash(genome)
+        for connection in genome.connections.values():
+            connection.enabled = not connection.enabled
+            self.assertNotEqual(genome_hash(genome), original, connection.key)
+            connection.enabled = not connection.enabled
+            self.assertEqual(genome_hash(genome), original, connection.key)
+
+    def test_weight_of_disabled_connection_is_ignored(self):
+        genome = copy.deepcopy(self.genome)
+        connection = next(iter(genome.connections.values()))
+        connection.enabled = False
+        original = genome_hash(genome)
+        connection.weight += 1
+        self.assertEqual(genome_hash(genome), original)
+
+    def test_changed_weight_changes_the_hash(self):
+        genome = copy.deepcopy(self.genome)
+        original = genome_hash(genome)
+        connection = next(connection for connection in genome.connections.values() if connection.enabled)
+        connection.weight += 1
+        self.assertNotEqual(genome_hash(genome), original)
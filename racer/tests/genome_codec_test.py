@@ -0,0 +1,40 @@
+import unittest
+
+import numpy as np
+from neat.nn import RecurrentNetwork
+
+from neat_common.genome_codec import GenomeArrays, as_genome, create_recurrent_network, encode_genome, network_genes
+from tests.genomes import load_neat_config, random_genomes
+
+GENOME_COUNT = 20
+ACTIVATIONS = 5
+
+
+class GenomeCodecTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.config = load_neat_config()
+        cls.genomes = random_genomes(cls.config, GENOME_COUNT, seed=2)
+
+    def test_decoded_genome_equals_genome(self):
+        genome_config = self.config.genome_config
+        for genome in self.genomes:
+            decoded = as_genome(GenomeArrays.decode(encode_genome(genome, genome_config)), genome_config)
+            self.assertEqual(decoded.key, genome.key)
+            self.assertEqual(str(decoded), str(genome))
+            self.assertEqual(list(decoded.connections), list(genome.connections))
+
+    def test_network_genes_of_decoded_genome(self):
+        genome_config = self.config.genome_config
+        for genome in self.genomes:
+            arrays = GenomeArrays.decode(encode_genome(genome, genome_config))
+            self.assertEqual(network_genes(arrays, genome_config), network_genes(genome, genome_config))
+
+    def test_recurrent_network_of_decoded_genome(self):
+        rng = np.random.default_rng(2)
+        for genome in self.genomes:
+            arrays = GenomeArrays.decode(encode_genome(genome, self.config.genome_config))
+            expected_net = RecurrentNetwork.create(genome, self.config)
+            net = create_recurrent_network(arrays, self.config)
+            for net_input in rng.uniform(-5, 5, (ACTIVATIONS, self.config.genome_config.num_inputs)).tolist():
+                self.assertEqual(net.activate(net_input), expected_net.activate(net_input))
@@ -0,0 +1,41 @@
+import random
+
+from game.tracers import TRACE_LINE_ANGLES
+from neural.training_configs import load_configs
+
+MUTATIONS = 30
+UNUSED_NODES = 2
+
+
+def load_neat_config():
+    return load_configs()[0]
+
+
+def load_tracer_config():
+    """ config with one network input per tracer, the configured inputs include a retired sensor """
+    config = load_neat_config()
+    genome_config = config.genome_config
+    genome_config.num_inputs = len(TRACE_LINE_ANGLES)
+    genome_config.input_keys = [-ix - 1 for ix in range(genome_config.num_inputs)]
+    return config
+
+
+def random_genomes(config, count, seed):
+    """ mutated genomes with all activations, disabled connections and nodes that are not connected """
+    genome_config = config.genome_config
+    random.seed(seed)
+    genomes = []
+    for key in range(count):
+        genome = config.genome_type(key)
+        genome.configure_new(genome_config)
+        for _ in range(random.randint(0, MUTATIONS)):
+            genome.mutate(genome_config)
+        for conn in genome.connections.values():
+            conn.enabled = conn.enabled and random.random() > 0.2
+        for node in genome.nodes.values():
+            node.activation = random.choice(genome_config.activation_options)
+        for _ in range(UNUSED_NODES):
+            node_key = genome_config.get_new_node_key(genome.nodes)
+            genome.nodes[node_key] = genome.create_node(genome_config, node_key)
+        genomes.append(genome)
+    return genomes
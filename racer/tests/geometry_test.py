@@ -0,0 +1,32 @@
+import unittest
+
+import numpy as np
+
+from game.geometry import RingPath, closest_on_segments
+from game.tracks import MANUAL_LEVELS
+
+SAMPLES = 5000
+TRACK_OFFSET = 150
+
+
+def sample_points(rng, level, path):
+    # cars stay close to the track lines, the level area catches the rest
+    on_line = np.array([path.interpolate(distance) for distance in rng.uniform(0, path.length, SAMPLES)])
+    near = on_line + rng.uniform(-TRACK_OFFSET, TRACK_OFFSET, (SAMPLES, 2))
+    anywhere = rng.uniform((-200, -200), (level.width + 200, level.height + 200), (SAMPLES, 2))
+    return np.concatenate((near, anywhere))
+
+
+class RingPathTestCase(unittest.TestCase):
+    def test_project_point_matches_global_projection_on_all_levels(self):
+        rng = np.random.default_rng(0)
+        for level in MANUAL_LEVELS:
+            for points in (level.outer_track, level.inner_track):
+                path = RingPath(points)
+                samples = sample_points(rng, level, path)
+                _, expected_edges, _ = closest_on_segments(samples, path.starts, path.deltas)
+                expected = path.project(samples)
+                actual = [path.project_point(x, y) for x, y in samples.tolist()]
+                np.testing.assert_array_equal([edge_ix for _, edge_ix in actual], expected_edges, err_msg=level.name)
+                np.testing.assert_allclose([distance for distance, _ in actual], expected, atol=1e-9,
+                                           err_msg=level.name)
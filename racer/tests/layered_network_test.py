@@ -0,0 +1,44 @@
+import unittest
+
+import numpy as np
+from neat.nn import FeedForwardNetwork
+
+from neural.layered_network import LayeredNetwork, NetworkBatch
+from tests.genomes import load_neat_config, random_genomes
+
+GENOME_COUNT = 40
+INPUT_COUNT = 20
+
+
+class LayeredNetworkTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.config = load_neat_config()
+        cls.genomes = random_genomes(cls.config, GENOME_COUNT, seed=0)
+        rng = np.random.default_rng(0)
+        cls.inputs = rng.uniform(-50, 500, (INPUT_COUNT, cls.config.genome_config.num_inputs))
+
+    def expected_outputs(self, genome):
+        net = FeedForwardNetwork.create(genome, self.config)
+        return np.array([net.activate(net_input) for net_input in self.inputs.tolist()])
+
+    def test_activate_matches_feed_forward_network(self):
+        for genome in self.genomes:
+            net = LayeredNetwork.create(genome, self.config)
+            actual = [net.activate(net_input) for net_input in self.inputs.tolist()]
+            np.testing.assert_allclose(actual, self.expected_outputs(genome), atol=1e-12, err_msg=str(genome.key))
+            np.testing.assert_allclose(net.activate_all(self.inputs), self.expected_outputs(genome), atol=1e-12)
+
+    def test_batch_matches_feed_forward_network(self):
+        batch = NetworkBatch([LayeredNetwork.create(genome, self.config) for genome in self.genomes])
+        expected = [self.expected_outputs(genome) for genome in self.genomes]
+        for input_ix, net_input in enumerate(self.inputs):
+            actual = batch.activate_all(np.tile(net_input, (GENOME_COUNT, 1)))
+            np.testing.assert_allclose(actual, [outputs[input_ix] for outputs in expected], atol=1e-12)
+
+    def test_batch_members_match_feed_forward_network(self):
+        batch = NetworkBatch([LayeredNetwork.create(genome, self.config) for genome in self.genomes])
+        members = np.arange(0, GENOME_COUNT, 3)
+        actual = batch.activate_all(np.tile(self.inputs[0], (len(members), 1)), members)
+        expected = [self.expected_outputs(self.genomes[ix])[0] for ix in members]
+        np.testing.assert_allclose(actual, expected, atol=1e-12)
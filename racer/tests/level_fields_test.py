@@ -0,0 +1,78 @@
+import unittest
+
+import numpy as np
+
+from game.compiled_level import compile_level
+from game.geometry import closest_on_segments
+from game.racer_engine import CAR_COLL_RADIUS, Track
+from game.tracks import MANUAL_LEVELS
+from tests.collision_test import random_cars
+
+RESOLUTION = 4
+SAMPLES = 20000
+
+
+def exact_clearance(compiled_level, points):
+    collision = compiled_level.collision
+    inside = collision.rings.contain_points(points) & ~collision.obstacles.contain_points(points)
+    edges = collision.edges.edges
+    distance = closest_on_segments(points, edges[:, 0], edges[:, 1] - edges[:, 0])[0]
+    return np.where(inside, distance, -distance), inside
+
+
+def progress_corners(fields, progress, points):
+    # the four cell centres the progress of the points is interpolated from
+    col_pos = np.clip(points[:, 0] / fields.resolution - 0.5, 0, fields.cols - 1)
+    row_pos = np.clip(points[:, 1] / fields.resolution - 0.5, 0, fields.rows - 1)
+    col = np.minimum(col_pos.astype(int), fields.cols - 2)
+    row = np.minimum(row_pos.astype(int), fields.rows - 2)
+    return np.stack((progress[row, col], progress[row, col + 1], progress[row + 1, col], progress[row + 1, col + 1]))
+
+
+class LevelFieldsTestCase(unittest.TestCase):
+    def test_clearance_never_overstates_exact_clearance(self):
+        rng = np.random.default_rng(0)
+        for level in MANUAL_LEVELS:
+            compiled_level = compile_level(level)
+            points = rng.uniform((0, 0), (level.width, level.height), (SAMPLES, 2))
+            exact, _ = exact_clearance(compiled_level, points)
+            clearance = compiled_level.fields(RESOLUTION).clearance(points[:, 0], points[:, 1])
+            self.assertTrue(np.all(clearance <= exact), level.name)
+
+    def test_cars_clear_of_walls_pass_exact_collision(self):
+        rng = np.random.default_rng(1)
+        for level in MANUAL_LEVELS:
+            compiled_level = compile_level(level)
+            cars = random_cars(rng, level)
+            center_x, center_y = np.mean(cars, axis=1).T
+            clear = compiled_level.fields(RESOLUTION).clearance(center_x, center_y) > CAR_COLL_RADIUS
+            self.assertTrue(clear.any(), level.name)
+            self.assertTrue(np.all(compiled_level.collision.contains_all(cars[clear])), level.name)
+
+    def test_progress_is_close_to_exact_projection_without_jumps(self):
+        rng = np.random.default_rng(2)
+        for level in MANUAL_LEVELS:
+            compiled_level = compile_level(level)
+            fields = compiled_level.fields(RESOLUTION)
+            points = rng.uniform((0, 0), (level.width, level.height), (SAMPLES, 2))
+            points = points[exact_clearance(compiled_level, points)[1]]
+            for path, progress, field in zip((fields.outer_path, fields.inner_path), fields.progress(*points.T),
+                                             (fields.outer_progress, fields.inner_progress)):
+                # progress jumps where the closest ring segment switches, the engine re-projects there
+                corners = progress_corners(fields, field, points)
+                continuous = np.ptp(corners, axis=0) <= RESOLUTION * np.sqrt(2)
+                self.assertGreater(np.mean(continuous), 0.9, level.name)
+                exact = np.array([path.project_point(x, y)[0] for x, y in points[continuous].tolist()])
+                np.testing.assert_array_less(np.abs(progress[continuous] - exact), fields.lookup_error,
+                                             err_msg=level.name)
+
+    def test_track_checks_cars_near_walls_exactly(self):
+        rng = np.random.default_rng(3)
+        for level in MANUAL_LEVELS:
+            compiled_level = compile_level(level)
+            cars = random_cars(rng, level)
+            exact = compiled_level.collision.contains_all(cars)
+            track = Track(level, fields=compiled_level.fields(RESOLUTION))
+            self.assertTrue(exact.any() and not exact.all(), level.name)
+            np.testing.assert_array_equal(track.contains_all(cars), exact, err_msg=level.name)
+            np.testing.assert_array_equal([track.contains(car) for car in cars], exact, err_msg=level.name)
@@ -0,0 +1,41 @@
+import unittest
+
+from benchmark import load_example_genomes
+from game.tracks import Trainings
+from neural.lockstep_evaluator import LockstepEvaluator
+from neural.neural_player import NeuralPlayer, LAYERED_NETWORK, NEAT_NETWORK
+from tests.genomes import load_tracer_config, random_genomes
+
+EXAMPLE_COUNT = 3
+RANDOM_COUNT = 3
+LEVEL_COUNT = 2
+FIELD_RESOLUTION = 4
+SEEDS = [11, 12, 13, 14, 15, 16]
+
+
+class LockstepEvaluatorTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.config = load_tracer_config()
+        examples = load_example_genomes(cls.config.genome_config)
+        # example genomes drive the levels, random genomes crash or stall early
+        cls.genomes = sorted(examples, key=lambda genome: genome.fitness, reverse=True)[:EXAMPLE_COUNT] + \
+            random_genomes(cls.config, RANDOM_COUNT, seed=5)
+        cls.levels = Trainings().entries()[:LEVEL_COUNT]
+
+    def assert_lockstep_equals_single(self, field_resolution, network):
+        for level, limit in self.levels:
+            lockstep = LockstepEvaluator.evaluate_genomes(self.genomes, self.config, level, limit,
+                                                          field_resolution, SEEDS)
+            single = [NeuralPlayer.evaluate_genome(genome, self.config, level, limit, field_resolution, network, seed)
+                      for genome, seed in zip(self.genomes, SEEDS)]
+            self.assertEqual(lockstep, single, level.name)
+            self.assertTrue(any(single), level.name)
+
+    def test_lockstep_equals_single_evaluation(self):
+        for network in (LAYERED_NETWORK, NEAT_NETWORK):
+            with self.subTest(network=network):
+                self.assert_lockstep_equals_single(0, network)
+
+    def test_lockstep_equals_single_evaluation_with_fields(self):
+        self.assert_lockstep_equals_single(FIELD_RESOLUTION, LAYERED_NETWORK)
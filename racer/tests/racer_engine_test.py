@@ -0,0 +1,66 @@
+import unittest
+
+import numpy as np
+
+from game.compiled_level import compile_level
+from game.racer_engine import BatchRacerEngine, PlayerOperation, RacerEngine
+from game.tracks import MANUAL_LEVELS
+from neural.training_dts import DtSampler
+
+CAR_COUNT = 8
+STEP_COUNT = 200
+OPERATION_STEPS = 25
+FIELD_RESOLUTION = 4
+# forward, reverse, left, right: cars mostly drive forward, some reverse across the start line
+OPERATION_CHANCES = [0.7, 0.2, 0.3, 0.3]
+
+
+def random_operations(rng):
+    operations = rng.random((STEP_COUNT // OPERATION_STEPS + 1, CAR_COUNT, 4)) < OPERATION_CHANCES
+    operations[:, :, PlayerOperation.REV_IX] &= ~operations[:, :, PlayerOperation.FWD_IX]
+    operations[:, :, PlayerOperation.RIGHT_IX] &= ~operations[:, :, PlayerOperation.LEFT_IX]
+    operations[:, 0] = [False, True, False, False]
+    return np.repeat(operations, OPERATION_STEPS, axis=0)[:STEP_COUNT]
+
+
+def player_operation(flags):
+    operation = PlayerOperation()
+    fwd, rev, left, right = flags.tolist()
+    if fwd:
+        operation.accelerate()
+    elif rev:
+        operation.reverse()
+    if left:
+        operation.turn_left()
+    elif right:
+        operation.turn_right()
+    return operation
+
+
+class BatchRacerEngineTestCase(unittest.TestCase):
+    def assert_batch_equals_single_cars(self, field_resolution):
+        rng = np.random.default_rng(0)
+        for level in MANUAL_LEVELS:
+            fields = compile_level(level).fields(field_resolution) if field_resolution else None
+            batch = BatchRacerEngine(level, CAR_COUNT, fields)
+            engines = [RacerEngine(level, fields) for _ in range(CAR_COUNT)]
+            samplers = [DtSampler(seed) for seed in range(CAR_COUNT)]
+            for step, operations in enumerate(random_operations(rng)):
+                dts = np.array([sampler.next_dt() for sampler in samplers])
+                batch.update(dts, operations)
+                for car, engine in enumerate(engines):
+                    if not engine.game_over:
+                        engine.update(dts[car], player_operation(operations[car]))
+                states = [engine.player_state for engine in engines]
+                msg = '{} step {}'.format(level.name, step)
+                np.testing.assert_array_equal(batch.is_alive, [not engine.game_over for engine in engines], msg)
+                np.testing.assert_array_equal(batch.x, [state.x for state in states], msg)
+                np.testing.assert_array_equal(batch.y, [state.y for state in states], msg)
+                np.testing.assert_array_equal(batch.rotation, [state.rotation for state in states], msg)
+                np.testing.assert_array_equal(batch.distance, [state.distance for state in states], msg)
+
+    def test_batch_equals_single_cars_on_all_levels(self):
+        self.assert_batch_equals_single_cars(0)
+
+    def test_batch_equals_single_cars_with_fields_on_all_levels(self):
+        self.assert_batch_equals_single_cars(FIELD_RESOLUTION)
@@ -0,0 +1,51 @@
+import copy
+import pickle
+import random
+import unittest
+
+import numpy as np
+from neat.nn import FeedForwardNetwork
+
+from neat_common.source_network import AGGREGATION_SOURCE, create_source_network
+from tests.genomes import load_neat_config, random_genomes
+
+GENOME_COUNT = 40
+INPUT_COUNT = 20
+
+
+class SourceNetworkTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.config = load_neat_config()
+        cls.genomes = random_genomes(cls.config, GENOME_COUNT, seed=1)
+        rng = np.random.default_rng(1)
+        cls.inputs = rng.uniform(-50, 500, (INPUT_COUNT, cls.config.genome_config.num_inputs)).tolist()
+
+    def test_outputs_equal_feed_forward_network(self):
+        for genome in self.genomes:
+            expected_net = FeedForwardNetwork.create(genome, self.config)
+            net = create_source_network(genome, self.config)
+            for net_input in self.inputs:
+                self.assertEqual(net.activate(net_input), expected_net.activate(net_input), genome.key)
+
+    def test_aggregations_equal_feed_forward_network(self):
+        random.seed(1)
+        for genome in self.genomes:
+            genome = copy.deepcopy(genome)
+            for node in genome.nodes.values():
+                node.aggregation = random.choice(list(AGGREGATION_SOURCE))
+            expected_net = FeedForwardNetwork.create(genome, self.config)
+            net = create_source_network(genome, self.config)
+            for net_input in self.inputs:
+                self.assertEqual(net.activate(net_input), expected_net.activate(net_input), genome.key)
+
+    def test_pickled_network_keeps_outputs(self):
+        genome = self.genomes[-1]
+        net = create_source_network(genome, self.config)
+        unpickled = pickle.loads(pickle.dumps(net))
+        self.assertEqual(unpickled.activate(self.inputs[0]), net.activate(self.inputs[0]))
+
+    def test_wrong_input_count(self):
+        net = create_source_network(self.genomes[0], self.config)
+        with self.assertRaises(RuntimeError):
+            net.activate(self.inputs[0][:-1])
@@ -0,0 +1,30 @@
+import unittest
+
+from game.tracks import MANUAL_LEVELS, Trainings
+
+
+def iterate(trainings):
+    visited = []
+    while trainings.has_next():
+        visited.append(trainings.next())
+    return visited
+
+
+class TrainingsTestCase(unittest.TestCase):
+    def test_every_level_is_visited_once(self):
+        trainings = Trainings()
+        visited = iterate(trainings)
+        self.assertEqual(sorted(level.name for level, _ in visited), sorted(level.name for level in MANUAL_LEVELS))
+        self.assertEqual(visited, trainings.entries())
+        self.assertFalse(trainings.has_next())
+
+    def test_reset_starts_over(self):
+        trainings = Trainings()
+        first = iterate(trainings)
+        trainings.reset()
+        self.assertEqual(iterate(trainings), first)
+
+    def test_entries_are_a_copy(self):
+        trainings = Trainings()
+        trainings.entries().clear()
+        self.assertEqual(len(iterate(trainings)), len(MANUAL_LEVELS))
@@ -0,0 +1,113 @@
+import copy
+import os
+import random
+import tempfile
+import unittest
+from unittest import mock
+
+import neat
+import numpy as np
+
+from neural import training_checkpoint
+from neural.best_player_keep import BestPlayerKeep
+from neural.training_checkpoint import TrainingCheckpoint, counter_value, load_checkpoint
+from neural.training_configs import load_configs
+from neural.training_reporter import TrainingReporter
+from tests.genomes import load_tracer_config
+
+POPULATION_SEED = 0
+
+
+def random_fitness(key_genome_tuples, config):
+    # draws from both global generators, a resumed run only repeats them if their states are restored
+    for _, genome in key_genome_tuples:
+        weights = sum(conn.weight for conn in genome.connections.values() if conn.enabled)
+        genome.fitness = weights + 100 * random.random() + 100 * np.random.random()
+
+
+def population_state(population):
+    species_set = population.species
+    return {
+        'generation': population.generation,
+        'genomes': {key: (str(genome), genome.fitness) for key, genome in population.population.items()},
+        'species': {key: sorted(species.members) for key, species in species_set.species.items()},
+        'ancestors': dict(population.reproduction.ancestors)
+    }
+
+
+def best_keep_state(best_keep):
+    state = dict(best_keep.get_state())
+    state['top_list'] = [(player.name, player.fitness) for player in state['top_list']]
+    return state
+
+
+class TrainingCheckpointTestCase(unittest.TestCase):
+    def setUp(self):
+        self.neat_config = load_tracer_config()
+        self.training_config = load_configs()[1]
+        self.checkpoints_dir = tempfile.TemporaryDirectory()
+        patcher = mock.patch.object(training_checkpoint, 'CHECKPOINTS_DIR', self.checkpoints_dir.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.checkpoints_dir.cleanup)
+
+    def create_keepers(self):
+        return TrainingReporter(self.training_config.showcase_batch_size), BestPlayerKeep(self.training_config)
+
+    def create_training(self, every_gen=0):
+        random.seed(POPULATION_SEED)
+        np.random.seed(POPULATION_SEED)
+        population = neat.Population(self.neat_config)
+        reporter, best_keep = self.create_keepers()
+        population.add_reporter(reporter)
+        checkpoint = TrainingCheckpoint(every_gen, population, reporter, best_keep)
+        population.add_reporter(checkpoint)
+        return population, reporter, best_keep, checkpoint
+
+    def test_checkpoints_are_written_every_n_generations(self):
+        population, _, _, checkpoint = self.create_training(every_gen=2)
+        population.run(random_fitness, 1)
+        checkpoint.wait()
+        self.assertFalse(os.path.exists(checkpoint.file_name))
+        population.run(random_fitness, 1)
+        checkpoint.wait()
+        self.assertTrue(os.path.exists(checkpoint.file_name))
+
+    def test_snapshot_keeps_live_population(self):
+        population, _, _, checkpoint = self.create_training()
+        population.run(random_fitness, 1)
+        indexers = population.species.indexer, population.reproduction.genome_indexer
+        genomes = dict(population.population)
+        checkpoint.flush()
+        self.assertIs(population.species.indexer, indexers[0])
+        self.assertIs(population.reproduction.genome_indexer, indexers[1])
+        self.assertEqual(population.population, genomes)
+
+    def test_resumed_training_continues_like_the_original(self):
+        population, reporter, best_keep, checkpoint = self.create_training()
+        best_keep.genome_keys = [0, 1]
+
+        population.run(random_fitness, 1)
+        checkpoint.flush()
+        saved_reporter, saved_best_keep = copy.deepcopy(reporter.get_state()), best_keep_state(best_keep)
+        saved_random, saved_np_random = random.getstate(), np.random.get_state()
+        saved_population = population_state(population)
+        species_index = counter_value(population.species.indexer)
+        genome_index = counter_value(population.reproduction.genome_indexer)
+
+        population.run(random_fitness, 1)
+        expected = population_state(population)
+
+        resumed_reporter, resumed_best_keep = self.create_keepers()
+        resumed = load_checkpoint(checkpoint.file_name, self.neat_config, resumed_reporter, resumed_best_keep)
+        self.assertEqual(population_state(resumed), saved_population)
+        self.assertEqual(resumed_reporter.get_state(), saved_reporter)
+        self.assertEqual(best_keep_state(resumed_best_keep), saved_best_keep)
+        self.assertEqual(random.getstate(), saved_random)
+        np.testing.assert_array_equal(np.random.get_state()[1], saved_np_random[1])
+        self.assertEqual(next(resumed.species.indexer), species_index)
+        self.assertEqual(next(resumed.reproduction.genome_indexer), genome_index)
+
+        resumed = load_checkpoint(checkpoint.file_name, self.neat_config, resumed_reporter, resumed_best_keep)
+        resumed.run(random_fitness, 1)
+        self.assertEqual(population_state(resumed), expected)
@@ -0,0 +1,36 @@
+import os
+import tempfile
+import unittest
+from configparser import ConfigParser
+
+from neural.training_configs import TrainingConfig, LOCAL_DIR
+
+CONFIG_FILE = os.path.join(LOCAL_DIR, 'training.cfg')
+
+
+def training_config(**options):
+    parameters = ConfigParser()
+    parameters.read(CONFIG_FILE)
+    for option, value in options.items():
+        parameters.set(TrainingConfig.SECTION, option, value)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        config_path = os.path.join(tmp_dir, 'training.cfg')
+        with open(config_path, 'w') as f:
+            parameters.write(f)
+        return TrainingConfig(config_path)
+
+
+class TrainingConfigTestCase(unittest.TestCase):
+    def test_lockstep_rejects_recording_and_timing(self):
+        for option, value in (('record_trajectories', 'yes'), ('record_sensors', 'yes'), ('phase_timing', 'yes'),
+                              ('trajectory_archive', 'trajectories')):
+            with self.assertRaises(RuntimeError, msg=option) as context:
+                training_config(lockstep='yes', **{option: value})
+            self.assertIn(option, str(context.exception))
+
+    def test_lockstep_ignored_by_curriculum_tasks(self):
+        config = training_config(lockstep='yes', curriculum_tasks='yes', phase_timing='yes')
+        self.assertTrue(config.phase_timing)
+
+    def test_lockstep_without_recording(self):
+        self.assertTrue(training_config(lockstep='yes').lockstep)
@@ -0,0 +1,50 @@
+import unittest
+
+import numpy as np
+
+from neural.training_dts import DEVIATIONS, DISTRIBUTION_RATIOS, LIMITS_DIGITS, LIMIT_HIGH, LIMIT_LOW, MEANS, \
+    DtSampler, sample_dts
+
+SAMPLE_SIZE = 200000
+WEIGHT_TOLERANCE = 0.005
+BLOCK_SIZE = 7
+BLOCKS = 3
+
+
+def component_weights():
+    return np.diff(DISTRIBUTION_RATIOS, prepend=0, append=1)
+
+
+class SampleDtsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.dts, self.distribution_ixs = sample_dts(np.random.default_rng(0), SAMPLE_SIZE)
+
+    def test_samples_are_within_limits(self):
+        round_dts = np.round(self.dts, LIMITS_DIGITS)
+        self.assertGreaterEqual(round_dts.min(), LIMIT_LOW)
+        self.assertLessEqual(round_dts.max(), LIMIT_HIGH)
+
+    def test_components_keep_their_weights(self):
+        # rejected samples are drawn again from their own component, the weights are not shifted
+        weights = np.bincount(self.distribution_ixs, minlength=len(MEANS)) / SAMPLE_SIZE
+        np.testing.assert_allclose(weights, component_weights(), atol=WEIGHT_TOLERANCE)
+
+    def test_components_follow_their_distribution(self):
+        for ix, (mean, deviation) in enumerate(zip(MEANS, DEVIATIONS)):
+            dts = self.dts[self.distribution_ixs == ix]
+            self.assertAlmostEqual(dts.mean(), mean, delta=0.1 * deviation, msg=ix)
+            self.assertAlmostEqual(dts.std(), deviation, delta=0.1 * deviation, msg=ix)
+
+
+class DtSamplerTestCase(unittest.TestCase):
+    def test_seeded_samplers_repeat(self):
+        first, second = DtSampler(3), DtSampler(3)
+        dts = [first.next_dt() for _ in range(BLOCKS * BLOCK_SIZE)]
+        self.assertEqual(dts, [second.next_dt() for _ in range(BLOCKS * BLOCK_SIZE)])
+        self.assertNotEqual(dts, [DtSampler(4).next_dt() for _ in range(BLOCKS * BLOCK_SIZE)])
+
+    def test_blocks_continue_the_seeded_stream(self):
+        sampler = DtSampler(5, BLOCK_SIZE)
+        rng = np.random.default_rng(5)
+        expected = np.concatenate([sample_dts(rng, BLOCK_SIZE)[0] for _ in range(BLOCKS)])
+        self.assertEqual([sampler.next_dt() for _ in range(BLOCKS * BLOCK_SIZE)], expected.tolist())
@@ -0,0 +1,70 @@
+import glob
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from neural import trajectory_archive
+from neural.trajectory import STATE_COLUMNS, Trajectory
+from neural.trajectory_archive import FLUSH_SECONDS, INDEX_SUFFIX, TrajectoryArchive, TrajectoryArchiveWriter
+
+RUN_ROWS = 10
+SEGMENT_ROWS = 3 * RUN_ROWS
+
+
+def create_trajectory(genome_key, level_name='level'):
+    data = np.full((RUN_ROWS, STATE_COLUMNS), genome_key, dtype=np.float32)
+    return Trajectory(genome_key, level_name, float(genome_key), data)
+
+
+class TrajectoryArchiveTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.time = 0.0
+        clock = mock.Mock(monotonic=lambda: self.time, time=time.time)
+        patcher = mock.patch.object(trajectory_archive, 'time', clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def segment_count(self):
+        return len(glob.glob(os.path.join(self.directory.name, '*' + INDEX_SUFFIX)))
+
+    def test_segments_are_bounded_by_rows(self):
+        writer = TrajectoryArchiveWriter(self.directory.name, SEGMENT_ROWS)
+        for genome_key in range(7):
+            writer.append(1, create_trajectory(genome_key))
+        self.assertEqual(self.segment_count(), 2)
+        writer.flush()
+        self.assertEqual(self.segment_count(), 3)
+
+        archive = TrajectoryArchive(self.directory.name)
+        self.assertEqual(len(archive.index), 7)
+        for ix in range(7):
+            trajectory = archive.trajectory(ix)
+            self.assertEqual(trajectory.genome_key, ix)
+            np.testing.assert_array_equal(trajectory.data, create_trajectory(ix).data)
+
+    def test_segments_are_bounded_by_age_of_oldest_run(self):
+        writer = TrajectoryArchiveWriter(self.directory.name, SEGMENT_ROWS)
+        writer.append(1, create_trajectory(0))
+        # an idle process doesn't postpone the flush of its buffered runs
+        self.time += 2 * FLUSH_SECONDS
+        writer.append(1, create_trajectory(1))
+        self.assertEqual(self.segment_count(), 1)
+        writer.append(1, create_trajectory(2))
+        self.time += FLUSH_SECONDS / 2
+        writer.append(1, create_trajectory(3))
+        self.assertEqual(self.segment_count(), 1)
+
+    def test_select_by_generation_and_level(self):
+        writer = TrajectoryArchiveWriter(self.directory.name, SEGMENT_ROWS)
+        for generation in range(3):
+            for level_name in ('first', 'second'):
+                writer.append(generation, create_trajectory(generation, level_name))
+        writer.flush()
+        selected = TrajectoryArchive(self.directory.name).select(generation=1, level_name='second')
+        self.assertEqual([(trajectory.genome_key, trajectory.level_name) for trajectory in selected], [(1, 'second')])